@@ -0,0 +1,107 @@
+"""
+Hit rate, wrong answers and time saved of the Learn-page answer cache per similarity threshold.
+
+Simulates students asking questions about a handful of documents: every canonical
+question (acronym, number and concept questions, as in bench_hybrid) has a Zipf-like
+popularity and is asked in one of several phrasings. A miss costs --answer-seconds
+(retrieval plus the LLM call, not actually waited for) and stores the answer; a hit costs
+the lookup. Reports per threshold:
+  * hit rate        - questions answered from the cache
+  * wrong hits      - hits whose cached answer belongs to a different canonical question
+  * saved s / 100 q - answer time saved per 100 questions
+  * lookup p50 ms   - embedding (cached) plus similarity search
+
+Hash embeddings (the default, offline) only see shared words; run with the app's model to
+choose ANSWER_CACHE_THRESHOLD:
+
+    python -m benchmarks.bench_answer_cache [--provider openai --model text-embedding-3-small]
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from benchmarks.bench_offline import WORDS, percentile
+from service.answer_cache import AnswerCache
+from service.embedding_cache import EmbeddingCache, CachedEmbeddings
+from service.embedding_providers import create_embeddings
+from service.settings import setting
+
+PHRASINGS = {
+    "acronym": ["What does {a} stand for?", "what does {a} stand for", "Can you tell me what {a} stands for?",
+                "{a} stands for what?", "What is the meaning of {a}?"],
+    "number": ["What was the {w} value in {y}?", "what was the {w} value in {y}", "In {y}, what was the {w} value?",
+               "What {w} value was recorded in {y}?"],
+    "concept": ["Explain {w} and {v}.", "Can you explain {w} and {v}?", "explain {w} and {v}",
+                "What is the relation between {w} and {v}?"],
+}
+
+
+def canonical_questions(n, rng):
+    questions = {}   # (document, first phrasing) -> (document, kind, fields); distinct questions only
+    while len(questions) < n:
+        kind = rng.choice(list(PHRASINGS))
+        w, v = rng.sample(WORDS, 2)
+        fields = {
+            "a": "".join(rng.choices(string.ascii_uppercase, k=3)) + str(rng.randint(1, 9)),
+            "y": rng.randint(1900, 2020), "w": w, "v": v,
+        }
+        document_id = f"doc-{len(questions) % 5}"
+        questions.setdefault((document_id, PHRASINGS[kind][0].format(**fields)), (document_id, kind, fields))
+    return list(questions.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", default="hash")
+    parser.add_argument("--model")
+    parser.add_argument("--thresholds", default="0.85,0.9,0.95,0.98")
+    parser.add_argument("--canonical", type=int, default=200, help="distinct questions")
+    parser.add_argument("--asked", type=int, default=2000, help="questions asked in total")
+    parser.add_argument("--answer-seconds", type=float, default=2.5, help="retrieval + LLM time of a miss")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    canonical = canonical_questions(args.canonical, rng)
+    weights = [1 / (rank + 1) for rank in range(len(canonical))]
+    stream = []
+    for index in rng.choices(range(len(canonical)), weights=weights, k=args.asked):
+        document_id, kind, fields = canonical[index]
+        stream.append((index, document_id, rng.choice(PHRASINGS[kind]).format(**fields)))
+
+    workdir = tempfile.mkdtemp(prefix="quizzer-bench-")
+    embeddings = CachedEmbeddings(
+        create_embeddings(args.provider, args.model, api_key=setting("OPENAI_API_KEY")),
+        EmbeddingCache(os.path.join(workdir, "embeddings.sqlite3"))
+    )
+    print(f"{args.asked} questions ({args.canonical} distinct, {sum(len(p) for p in PHRASINGS.values())} phrasings), "
+          f"{args.provider} '{embeddings.model}', {args.answer_seconds}s per miss")
+    print(f"{'threshold':>9} {'hit rate':>9} {'wrong hits':>11} {'saved s / 100 q':>16} {'lookup p50 ms':>14} {'p99':>7}")
+    for threshold in map(float, args.thresholds.split(",")):
+        cache = AnswerCache(os.path.join(workdir, f"answers-{threshold}.sqlite3"), threshold=threshold)
+        answered_for = {}   # cached question -> canonical index
+        wrong = 0
+        latencies = []
+        for index, document_id, question in stream:
+            start = time.perf_counter()
+            vector = embeddings.embed_query(question)
+            hit = cache.lookup(document_id, "v1", embeddings.model, question, vector)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if hit:
+                wrong += answered_for[hit["question"]] != index
+                continue
+            cache.put(document_id, "v1", embeddings.model, question, vector, f"answer {index}", [], args.answer_seconds)
+            answered_for[question] = index
+        stats = cache.stats()
+        hits = stats["hits"]
+        print(f"{threshold:9.2f} {stats['hit_rate']:9.3f} {wrong / max(1, hits):11.3f} "
+              f"{stats['seconds_saved'] * 100 / len(stream):16.1f} {statistics.median(latencies):14.2f} "
+              f"{percentile(latencies, 0.99):7.2f}")
+
+
+if __name__ == "__main__":
+    main()
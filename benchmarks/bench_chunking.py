@@ -0,0 +1,118 @@
+"""
+Compare the structure/token-aware chunker with the old CharacterTextSplitter(2000, 0).
+
+Builds a synthetic lecture-notes document with headings, paragraphs and page breaks and
+plants one fact per section. Retrieval runs offline with a TF-IDF cosine retriever, so
+the numbers compare chunk boundaries and not embedding quality. Reports:
+  * hit@k   - share of questions whose full answer sentence is inside the top-k chunks
+  * tokens  - prompt tokens spent on the top-k chunks
+  * chunking throughput on multi-megabyte input (should scale linearly)
+
+    python -m benchmarks.bench_chunking
+"""
+import argparse
+import math
+import random
+import re
+import time
+from collections import Counter
+
+from langchain_text_splitters import CharacterTextSplitter
+
+from service.chunking import StructuredChunker, TokenCounter
+
+TOPICS = ["graph", "matrix", "protein", "market", "circuit", "poem", "enzyme", "orbit", "tariff", "neuron"]
+FILLER = (
+    "Students should review the worked examples before the tutorial. The lecturer will "
+    "discuss common misconceptions and relate them to the assigned readings. Additional "
+    "exercises are provided at the end of the chapter for self study."
+)
+TOKEN = re.compile(r"\w+")
+
+
+def synthetic_document(sections, seed=7):
+    """Return (pages, questions). Each section plants one fact that a question asks about."""
+    rng = random.Random(seed)
+    pages, questions, page = [], [], []
+    for i in range(sections):
+        topic = TOPICS[i % len(TOPICS)]
+        code = f"{topic[:3].upper()}-{rng.randint(1000, 9999)}"
+        fact = f"The reference value for the {topic} case study number {i} is {code}."
+        paragraphs = [FILLER + " " + FILLER for _ in range(rng.randint(3, 7))]
+        paragraphs.insert(rng.randint(1, len(paragraphs)), fact)
+        page.append(f"{i + 1}. {topic.title()} Case Study {i}\n\n" + "\n\n".join(paragraphs))
+        questions.append((f"What is the reference value for the {topic} case study number {i}?", fact))
+        if len(page) == 2:
+            pages.append("\n\n".join(page) + "\n")
+            page = []
+    if page:
+        pages.append("\n\n".join(page) + "\n")
+    return list(enumerate(pages, start=1)), questions
+
+
+class TfidfRetriever:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        docs = [Counter(TOKEN.findall(c.lower())) for c in chunks]
+        df = Counter(term for d in docs for term in d)
+        n = len(docs)
+        self.idf = {t: math.log((n + 1) / (f + 1)) + 1 for t, f in df.items()}
+        self.vectors = [self._weigh(d) for d in docs]
+
+    def _weigh(self, counts):
+        vec = {t: (1 + math.log(c)) * self.idf.get(t, 0) for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {t: v / norm for t, v in vec.items()}
+
+    def search(self, query, k):
+        q = self._weigh(Counter(TOKEN.findall(query.lower())))
+        scores = [(sum(w * vec.get(t, 0) for t, w in q.items()), i) for i, vec in enumerate(self.vectors)]
+        return [self.chunks[i] for _, i in sorted(scores, reverse=True)[:k]]
+
+
+def evaluate(name, chunks, questions, counter, ks):
+    retriever = TfidfRetriever(chunks)
+    sizes = [counter.count(c) for c in chunks]
+    print(f"\n{name}: {len(chunks)} chunks, mean {sum(sizes) / len(sizes):.0f} tokens, max {max(sizes)}")
+    for k in ks:
+        hits, tokens = 0, 0
+        for question, fact in questions:
+            top = retriever.search(question, k)
+            hits += any(fact in c for c in top)
+            tokens += sum(counter.count(c) for c in top)
+        print(f"  k={k}: hit@k {hits / len(questions):.2%}   prompt tokens/question {tokens / len(questions):.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=300)
+    parser.add_argument("--chunk-tokens", type=int, default=400)
+    parser.add_argument("--overlap-tokens", type=int, default=50)
+    parser.add_argument("--ks", default="1,2,4")
+    args = parser.parse_args()
+
+    counter = TokenCounter()
+    pages, questions = synthetic_document(args.sections)
+    text = "".join(t for _, t in pages)
+    ks = [int(k) for k in args.ks.split(",")]
+    print(f"Document: {len(text)} chars, {len(pages)} pages, {len(questions)} questions")
+
+    splitter = CharacterTextSplitter(chunk_size=2000, chunk_overlap=0)
+    evaluate("CharacterTextSplitter(2000, 0)", splitter.split_text(text), questions, counter, ks)
+
+    chunker = StructuredChunker(args.chunk_tokens, args.overlap_tokens, counter)
+    evaluate(f"StructuredChunker({args.chunk_tokens}, {args.overlap_tokens})",
+             [c.text for c in chunker.chunk(pages)], questions, counter, ks)
+
+    print("\nChunking throughput:")
+    for repeat in (1, 2, 4):
+        big = [(i, t) for i, (_, t) in enumerate(pages * repeat * 4, start=1)]
+        size = sum(len(t) for _, t in big)
+        start = time.perf_counter()
+        n = sum(1 for _ in chunker.chunk(big))
+        elapsed = time.perf_counter() - start
+        print(f"  {size / 1e6:5.1f}M chars -> {n:6} chunks in {elapsed:6.2f}s ({size / elapsed / 1e6:.2f}M chars/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Recall vs latency vs memory of the collection profiles (service/collection_profiles.py).
+
+Every profile gets its own collection seeded with the same chunk embeddings, and answers
+the same queries. Reports per profile:
+  * recall@k  - overlap with exact cosine top-k computed in numpy
+  * p50 / p99 - search latency in ms
+  * RAM MB    - estimated resident size of vectors, quantized copies and HNSW graph
+
+Embeddings come from the app's embedding cache (--cache, real OpenAI chunk vectors) when
+given, otherwise from a synthetic generator that mimics their shape: a shared offset,
+topic clusters and per-chunk noise. Queries are perturbed chunk vectors, like questions
+about a passage.
+
+Quantization and HNSW only exist on a Qdrant server:
+
+    docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+    python -m benchmarks.bench_collection_profiles --points 50000 [--cache .cache/embeddings.sqlite3]
+
+With --url :memory: every profile falls back to exact search, which is only useful to
+check the script.
+"""
+import argparse
+import sqlite3
+import statistics
+import time
+import uuid
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from service.collection_profiles import PROFILES
+from service.embedding_pipeline import batched
+
+COLLECTION = "bench_profiles"
+
+
+def synthetic_embeddings(n, dim, rng, topics=200):
+    shared = rng.normal(size=dim)
+    centroids = rng.normal(size=(topics, dim))
+    labels = rng.integers(0, topics, size=n)
+    vectors = 0.5 * shared + centroids[labels] + 0.8 * rng.normal(size=(n, dim))
+    return normalize(vectors.astype(np.float32))
+
+
+def cached_embeddings(path, n):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT vector FROM embeddings LIMIT ?", (n,)).fetchall()
+    return normalize(np.array([np.frombuffer(blob, dtype=np.float32) for (blob,) in rows]))
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def wait_until_indexed(client, collection, timeout=600):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_collection(collection).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:6333")
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--cache", help="embedding cache SQLite file to take real chunk vectors from")
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = cached_embeddings(args.cache, args.points) if args.cache else synthetic_embeddings(args.points, args.dim, rng)
+    n, dim = vectors.shape
+    picks = rng.integers(0, n, size=args.queries)
+    queries = normalize(vectors[picks] + 0.05 * rng.normal(size=(args.queries, dim)).astype(np.float32))
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+    ids = [str(uuid.uuid4()) for _ in range(n)]
+    index_of = {point_id: i for i, point_id in enumerate(ids)}
+
+    client = QdrantClient(":memory:") if args.url == ":memory:" else QdrantClient(url=args.url, timeout=120)
+    print(f"{n} vectors x {dim} dims ({'embedding cache' if args.cache else 'synthetic'}), {args.queries} queries, k={args.k}")
+    print(f"{'profile':12} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8} {'RAM MB':>8} {'build s':>8}")
+    for name in args.profiles.split(","):
+        profile = PROFILES[name]
+        if client.collection_exists(COLLECTION):
+            client.delete_collection(COLLECTION)
+        start = time.perf_counter()
+        client.create_collection(
+            collection_name=COLLECTION,
+            vectors_config=profile.vector_params(dim),
+            hnsw_config=profile.hnsw_config(),
+            quantization_config=profile.quantization_config()
+        )
+        for batch in batched(range(n), 256):
+            client.upsert(
+                collection_name=COLLECTION,
+                points=[models.PointStruct(id=ids[i], vector=vectors[i].tolist()) for i in batch]
+            )
+        wait_until_indexed(client, COLLECTION)
+        build_s = time.perf_counter() - start
+
+        latencies, recalls = [], []
+        search_params = profile.search_params()
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            points = client.query_points(
+                COLLECTION, query=query.tolist(), limit=args.k, search_params=search_params, with_payload=False
+            ).points
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = {index_of[str(p.id)] for p in points}
+            recalls.append(len(found & set(expected.tolist())) / args.k)
+
+        latencies.sort()
+        print(
+            f"{name:12} {statistics.mean(recalls):9.3f} {statistics.median(latencies):8.2f} "
+            f"{latencies[int(0.99 * (len(latencies) - 1))]:8.2f} {profile.estimated_ram_bytes(n, dim) / 2**20:8.1f} {build_s:8.1f}"
+        )
+    client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Prompt size and answer coverage of the Learn page's context, before and after token-budgeted packing.
+
+A seeded synthetic corpus with planted facts (see bench_hybrid) is ingested offline, then
+every question is answered the old and the new way on both of the page's paths:
+  * fallback - search found nothing: every chunk of the file (old) vs chunks ranked by the
+               in-process lexical index and packed into CONTEXT_TOKEN_BUDGET (new)
+  * search   - k passages from search_passages (old) vs 2k candidates packed into the
+               budget, at most k, redundant ones dropped (new)
+Reports context tokens per question (p50 and max), coverage (the chunk holding the answer
+is in the context) overall and per question kind, and the time to build the context: on
+the fallback path the first question about a file builds its index, later ones reuse it.
+Passage questions are sentences of the synthetic text, whose few topic words every chunk
+shares; no ranking finds their chunk reliably, so acronym and number coverage matter more.
+
+    python -m benchmarks.bench_context_packing [--docs 20] [--pages 40] [--budget 3000] [--k 4]
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.bench_hybrid import plant_facts, build_questions
+from benchmarks.bench_offline import synthetic_corpus, offline_app, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--questions", type=int, default=100, help="per kind")
+    parser.add_argument("--budget", type=int, default=3000, help="CONTEXT_TOKEN_BUDGET")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    q = offline_app()
+    q.CONTEXT_TOKEN_BUDGET = args.budget
+
+    rng = random.Random(args.seed)
+    corpus = synthetic_corpus(args.docs, args.pages, rng)
+    facts = plant_facts(corpus, rng, per_doc=max(1, args.questions // args.docs))
+    q.save_many_to_qdrant((name, pages, None, None) for name, pages in corpus)
+    passages_by_file = {
+        name: q.chunk_passages(q.client, q.QDRANT_COLLECTION, q.match_filter(filename=name), q.PASSAGE_FIELDS)
+        for name, _ in corpus
+    }
+    questions = build_questions({name: [text for text, _ in p] for name, p in passages_by_file.items()},
+                                facts, args.questions, rng)
+
+    def all_chunks(question, filename):
+        passages = passages_by_file[filename]
+        return passages, sum(p["token_count"] for _, p in passages)
+
+    def ranked_and_packed(question, filename):
+        return q.pack_passages(q.rank_document_chunks(question, filename))
+
+    def search_k(question, filename):
+        passages = q.search_passages(question, filename, args.k).result()
+        return passages, sum(p["token_count"] for _, p in passages)
+
+    def search_and_pack(question, filename):
+        return q.pack_passages(q.search_passages(question, filename, 2 * args.k).result(), max_passages=args.k)
+
+    chunks = sum(len(p) for p in passages_by_file.values())
+    print(f"{args.docs} docs x {args.pages} pages ({chunks} chunks), {len(questions)} questions, "
+          f"budget {args.budget} tokens, k={args.k}, seed {args.seed}")
+    print(f"{'path':9} {'context':17} {'tokens p50':>10} {'max':>7} {'coverage':>9} {'acronym':>8} {'number':>7} "
+          f"{'passage':>8} {'build ms p50':>13} {'p99':>8}")
+    asked = Counter(kind for kind, *_ in questions)
+    strategies = [
+        ("fallback", "all chunks", all_chunks),
+        ("fallback", "lexical + packed", ranked_and_packed),
+        ("search", "k passages", search_k),
+        ("search", "2k + packed", search_and_pack),
+    ]
+    for path, name, build in strategies:
+        tokens, covered, latencies = [], Counter(), []
+        for kind, filename, question, answer_chunks in questions:
+            start = time.perf_counter()
+            passages, used = build(question, filename)
+            latencies.append((time.perf_counter() - start) * 1000)
+            tokens.append(used)
+            covered[kind] += any(p.get("chunk_index") in answer_chunks for _, p in passages)
+        by_kind = " ".join(f"{covered[kind] / max(1, asked[kind]):{width}.3f}" for kind, width in
+                           (("acronym", 8), ("number", 7), ("passage", 8)))
+        print(f"{path:9} {name:17} {statistics.median(tokens):10.0f} {max(tokens):7d} "
+              f"{sum(covered.values()) / len(questions):9.3f} {by_kind} "
+              f"{statistics.median(latencies):13.2f} {percentile(latencies, 0.99):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
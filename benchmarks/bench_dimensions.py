@@ -0,0 +1,102 @@
+"""
+Choose EMBEDDING_DIM: index memory, search latency and retrieval quality per vector size.
+
+The corpus and questions of bench_hybrid (planted acronyms and numbers plus passage
+questions) are embedded once at the model's full size. Every size in --dims then gets its
+own collection of truncated, renormalized vectors, which is what text-embedding-3's
+dimensions parameter returns and what TruncatedEmbeddings does for local models. Reports:
+  * RAM MB        - estimated resident size of vectors and HNSW graph (collection profile)
+  * p50 / p99     - per-question search latency in ms, filtered to one file like the app
+  * hit@k         - the chunk holding the answer is among the k results
+  * recall@k      - overlap with the full-size top-k
+
+Hash embeddings (the default, offline) are not Matryoshka-trained, so their quality falls
+off faster than a real model's; for a decision run with the model you intend to use:
+
+    python -m benchmarks.bench_dimensions [--provider openai --model text-embedding-3-small] [--dims 1536,512,256]
+
+A --url to a Qdrant server measures latency with HNSW instead of the local exact search.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from benchmarks.bench_hybrid import plant_facts, build_questions
+from benchmarks.bench_offline import synthetic_corpus, percentile
+from service.chunking import StructuredChunker
+from service.collection_profiles import PROFILES
+from service.embedding_pipeline import batched
+from service.embedding_providers import create_embeddings, default_dim, truncate
+from service.qdrant_queries import match_filter
+from service.settings import setting
+
+COLLECTION = "bench_dimensions"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", default="hash")
+    parser.add_argument("--model")
+    parser.add_argument("--dims", default="1536,1024,768,512,384,256,128")
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=100, help="per kind")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--profile", default="default")
+    parser.add_argument("--url", default=":memory:")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = synthetic_corpus(args.docs, args.pages, rng)
+    facts = plant_facts(corpus, rng, per_doc=max(1, args.questions // args.docs))
+    chunker = StructuredChunker()
+    chunks_by_file = {name: [chunk.text for chunk in chunker.chunk(pages)] for name, pages in corpus}
+    questions = build_questions(chunks_by_file, facts, args.questions, rng)
+    points = [(filename, i, text) for filename, texts in chunks_by_file.items() for i, text in enumerate(texts)]
+
+    embeddings = create_embeddings(args.provider, args.model, api_key=setting("OPENAI_API_KEY"))
+    full = default_dim(args.provider, args.model)
+    start = time.perf_counter()
+    vectors = [v for batch in batched([text for _, _, text in points], 64) for v in embeddings.embed_documents(batch)]
+    query_vectors = [embeddings.embed_query(question) for _, _, question, _ in questions]
+    print(f"{len(points)} chunks, {len(questions)} questions, {args.provider} '{embeddings.model}' "
+          f"({full} dims), embedded in {time.perf_counter() - start:.1f}s")
+
+    client = QdrantClient(":memory:") if args.url == ":memory:" else QdrantClient(url=args.url, timeout=120)
+    profile = PROFILES[args.profile]
+    baseline = None
+    print(f"{'dims':>5} {'RAM MB':>8} {'p50 ms':>8} {'p99 ms':>8} {'hit@' + str(args.k):>7} {'recall@' + str(args.k):>9}")
+    for dim in sorted({min(int(d), full) for d in args.dims.split(",")}, reverse=True):
+        if client.collection_exists(COLLECTION):
+            client.delete_collection(COLLECTION)
+        client.create_collection(COLLECTION, vectors_config=profile.vector_params(dim), hnsw_config=profile.hnsw_config(),
+                                 quantization_config=profile.quantization_config())
+        client.create_payload_index(COLLECTION, "filename", models.PayloadSchemaType.KEYWORD)
+        for batch in batched(range(len(points)), 256):
+            client.upsert(COLLECTION, points=[
+                models.PointStruct(id=i, vector=truncate(vectors[i], dim), payload={"filename": points[i][0], "chunk_index": points[i][1]})
+                for i in batch
+            ])
+
+        latencies, hits, results = [], 0, []
+        for (_, filename, _, answer_chunks), vector in zip(questions, query_vectors):
+            start = time.perf_counter()
+            found = client.query_points(COLLECTION, query=truncate(vector, dim), query_filter=match_filter(filename=filename),
+                                        limit=args.k, search_params=profile.search_params(), with_payload=True).points
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(p.payload["chunk_index"] in answer_chunks for p in found)
+            results.append({p.id for p in found})
+        baseline = baseline or results
+        recall = statistics.mean(len(r & b) / max(1, len(b)) for r, b in zip(results, baseline))
+        print(f"{dim:5} {profile.estimated_ram_bytes(len(points), dim) / 2**20:8.2f} {statistics.median(latencies):8.2f} "
+              f"{percentile(latencies, 0.99):8.2f} {hits / len(questions):7.3f} {recall:9.3f}")
+    client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
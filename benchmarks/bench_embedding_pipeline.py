@@ -0,0 +1,116 @@
+"""
+Benchmark the save_to_qdrant embedding path against a local fake embedding server.
+
+Compares the old one-`embed_query`-per-chunk loop with the batched, concurrent pipeline
+and reports chunks/sec and end-to-end upload latency (embedding + upsert into an
+in-memory Qdrant collection).
+
+    python -m benchmarks.bench_embedding_pipeline --chars 500000
+"""
+import argparse
+import time
+import uuid
+
+from langchain_openai import OpenAIEmbeddings
+from langchain_text_splitters import CharacterTextSplitter
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from benchmarks.fake_openai import start_server
+from service.embedding_pipeline import embed_and_upsert
+
+COLLECTION = "bench"
+WORDS = "lecture note student quiz exam theory proof example chapter section figure table".split()
+
+
+def synthetic_text(n_chars):
+    words, size, i = [], 0, 0
+    while size < n_chars:
+        word = WORDS[i % len(WORDS)] + str(i % 97)
+        words.append(word)
+        size += len(word) + 1
+        i += 1
+        if i % 120 == 0:
+            words.append("\n\n")
+    return " ".join(words)
+
+
+def fresh_collection(client, dim):
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE)
+    )
+
+
+def pending_points(chunks):
+    return [
+        {"id": uuid.uuid4().hex, "text": chunk, "payload": {"chunk_index": i, "chunk_text": chunk}}
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def run_serial(client, embeddings, chunks):
+    points = []
+    for p in pending_points(chunks):
+        points.append(models.PointStruct(id=p["id"], vector=embeddings.embed_query(p["text"]), payload=p["payload"]))
+        if len(points) >= 50:
+            client.upsert(collection_name=COLLECTION, points=points)
+            points = []
+    if points:
+        client.upsert(collection_name=COLLECTION, points=points)
+
+
+def run_pipeline(client, embeddings, chunks, batch_size, workers):
+    embed_and_upsert(
+        pending_points(chunks),
+        embeddings,
+        upsert=lambda points: client.upsert(collection_name=COLLECTION, points=points),
+        batch_size=batch_size,
+        max_workers=workers
+    )
+
+
+def report(label, n_chunks, elapsed, requests):
+    print(f"{label:<28} {n_chunks:>7} {elapsed:>10.2f} {n_chunks / elapsed:>12.1f} {requests:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=500_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latency", type=float, default=0.08, help="fake server seconds per request")
+    parser.add_argument("--batch-sizes", default="16,64,128")
+    parser.add_argument("--workers", default="1,4,8")
+    parser.add_argument("--skip-serial", action="store_true")
+    args = parser.parse_args()
+
+    server, base_url = start_server(dim=args.dim, request_latency=args.latency)
+    embeddings = OpenAIEmbeddings(api_key="fake", base_url=base_url, check_embedding_ctx_length=False)
+    client = QdrantClient(":memory:")
+    chunks = CharacterTextSplitter(chunk_size=2000, chunk_overlap=0).split_text(synthetic_text(args.chars))
+
+    print(f"{len(chunks)} chunks from {args.chars} chars, {args.latency * 1000:.0f} ms per embedding request\n")
+    print(f"{'mode':<28} {'chunks':>7} {'latency s':>10} {'chunks/sec':>12} {'requests':>9}")
+
+    if not args.skip_serial:
+        fresh_collection(client, args.dim)
+        server.requests = 0
+        start = time.perf_counter()
+        run_serial(client, embeddings, chunks)
+        report("serial embed_query", len(chunks), time.perf_counter() - start, server.requests)
+
+    for batch_size in map(int, args.batch_sizes.split(",")):
+        for workers in map(int, args.workers.split(",")):
+            fresh_collection(client, args.dim)
+            server.requests = 0
+            start = time.perf_counter()
+            run_pipeline(client, embeddings, chunks, batch_size, workers)
+            report(f"batch={batch_size} workers={workers}", len(chunks), time.perf_counter() - start, server.requests)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compare embedding providers (service/embedding_providers.py): ingestion throughput and
+question latency.
+
+For each provider
+  * ingest - the synthetic corpus of bench_offline, chunked like the app, through
+             embed_and_upsert into an in-memory collection of the provider's vector size
+  * query  - p50/p99 of embedding one question and searching the collection, what the
+             Learn page pays per question before calling the LLM
+The embedding cache is bypassed so every chunk and question is really embedded.
+
+"openai" talks to the real API when OPENAI_API_KEY is set and --openai is given, and to
+the local fake API (benchmarks/fake_openai.py, --latency seconds per request) otherwise.
+"fastembed" needs the fastembed package and downloads its model on first run.
+
+    python -m benchmarks.bench_embedding_providers [--providers hash,fastembed,openai] [--docs 10]
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from benchmarks.bench_offline import synthetic_corpus, percentile
+from benchmarks.fake_openai import start_server
+from service.chunking import StructuredChunker
+from service.embedding_pipeline import embed_and_upsert
+from service.embedding_providers import PROVIDERS, create_embeddings
+from service.settings import setting
+
+COLLECTION = "bench_providers"
+
+
+def provider_embeddings(name, args):
+    if name != "openai":
+        return create_embeddings(name)
+    api_key = setting("OPENAI_API_KEY")
+    if args.openai and api_key:
+        return create_embeddings(name, api_key=api_key)
+    from langchain_openai import OpenAIEmbeddings
+    _, base_url = start_server(dim=PROVIDERS[name].dim, request_latency=args.latency)
+    return OpenAIEmbeddings(api_key="fake", base_url=base_url, check_embedding_ctx_length=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--providers", default=",".join(PROVIDERS))
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake OpenAI API seconds per request")
+    parser.add_argument("--openai", action="store_true", help="use the real OpenAI API (needs OPENAI_API_KEY)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    chunks = [
+        chunk.text
+        for _, pages in synthetic_corpus(args.docs, args.pages, rng)
+        for chunk in StructuredChunker().chunk(pages)
+    ]
+    questions = [rng.choice(rng.choice(chunks).split(".")) for _ in range(args.queries)]
+    client = QdrantClient(":memory:")
+
+    print(f"{len(chunks)} chunks, {len(questions)} questions")
+    print(f"{'provider':10} {'dims':>5} {'model load s':>13} {'ingest chunks/s':>16} {'query p50 ms':>13} {'p99 ms':>8}")
+    for name in args.providers.split(","):
+        start = time.perf_counter()
+        try:
+            embeddings = provider_embeddings(name, args)
+        except ImportError as e:
+            print(f"{name:10} skipped: {e}")
+            continue
+        embeddings.embed_query("warm up")
+        load_s = time.perf_counter() - start
+        dim = len(embeddings.embed_query("dimension"))
+
+        if client.collection_exists(COLLECTION):
+            client.delete_collection(COLLECTION)
+        client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE))
+        start = time.perf_counter()
+        embed_and_upsert(
+            ({"id": str(uuid.uuid4()), "text": text, "payload": {"chunk_text": text}} for text in chunks),
+            embeddings,
+            upsert=lambda points: client.upsert(collection_name=COLLECTION, points=points)
+        )
+        ingest_s = time.perf_counter() - start
+
+        latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            client.query_points(COLLECTION, query=embeddings.embed_query(question), limit=4)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{name:10} {dim:5} {load_s:13.2f} {len(chunks) / ingest_s:16.0f} "
+            f"{statistics.median(latencies):13.2f} {percentile(latencies, 0.99):8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Retrieval quality of dense-only vs hybrid (dense + BM25, RRF-fused) search on the Learn page.
+
+A seeded synthetic corpus (see bench_offline) is ingested through save_many_to_qdrant with
+facts planted in its pages, then every question is asked through search_passages() in
+both modes. Question kinds:
+  * acronym    - "What does QZV4 stand for?" for a planted definition
+  * number     - "What was the pressure value in 1987?" for a planted measurement
+  * passage    - a sentence taken from a chunk, standing in for a paraphrased question
+
+For each mode and kind it reports hit@1 and hit@k (the chunk holding the answer is among
+the first 1 / k passages), and prompt tokens per answer: the context tokens of the
+passages up to and including the answer, i.e. the k a student would have had to pick
+(questions not answered within --max-k count --max-k passages).
+
+Runs offline with embedded Qdrant and hash embeddings. Hash embeddings are themselves
+lexical, so offline they understate what sparse search adds to real embeddings; pass
+--openai to embed with the app's OpenAI key instead (the corpus still stays local).
+
+    python -m benchmarks.bench_hybrid [--docs 30] [--pages 10] [--questions 150] [--openai]
+"""
+import argparse
+import random
+import string
+from collections import defaultdict
+
+from benchmarks.bench_offline import synthetic_corpus, offline_app, WORDS
+
+
+def plant_facts(corpus, rng, per_doc):
+    """Add acronym definitions and measurements to random pages. Returns (kind, filename, question, needle)."""
+    facts = []
+    for filename, pages in corpus:
+        for _ in range(per_doc):
+            page = rng.randrange(len(pages))
+            number, text = pages[page]
+            if rng.random() < 0.5:
+                acronym = "".join(rng.choices(string.ascii_uppercase, k=3)) + str(rng.randint(1, 9))
+                expansion = " ".join(rng.sample(WORDS, 3))
+                fact = f"{acronym} stands for {expansion}."
+                facts.append(("acronym", filename, f"What does {acronym} stand for?", acronym))
+            else:
+                word, year = rng.choice(WORDS), rng.randint(1900, 2020)
+                fact = f"The {word} value recorded in {year} was {rng.randint(10, 999)}."
+                facts.append(("number", filename, f"What was the {word} value in {year}?", str(year)))
+            paragraphs = text.split("\n\n")
+            paragraphs.insert(rng.randrange(len(paragraphs) + 1), fact)
+            pages[page] = (number, "\n\n".join(paragraphs))
+    return facts
+
+
+def build_questions(chunks_by_file, facts, n, rng):
+    """Up to n questions per kind as (kind, filename, question, set of chunk indexes holding the answer)."""
+    questions = []
+    for kind in ("acronym", "number"):
+        for _, filename, question, needle in [f for f in facts if f[0] == kind][:n]:
+            fact_chunks = {i for i, text in enumerate(chunks_by_file[filename]) if needle in text}
+            questions.append((kind, filename, question, fact_chunks))
+    for _ in range(n):
+        filename = rng.choice(list(chunks_by_file))
+        index = rng.randrange(len(chunks_by_file[filename]))
+        sentences = [s for s in chunks_by_file[filename][index].split(".") if len(s.split()) > 5]
+        questions.append(("passage", filename, rng.choice(sentences), {index}))
+    return questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=150, help="per kind")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--max-k", type=int, default=10, help="largest k the Learn page offers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--openai", action="store_true", help="embed with OpenAI instead of hash embeddings")
+    args = parser.parse_args()
+
+    q = offline_app()
+    if args.openai:
+        from langchain_openai import OpenAIEmbeddings
+        from service.embedding_cache import EmbeddingCache, CachedEmbeddings
+        q.embeddings.override(CachedEmbeddings(OpenAIEmbeddings(api_key=q.OPENAI_API_KEY), EmbeddingCache(q.EMBEDDING_CACHE_PATH)))
+
+    rng = random.Random(args.seed)
+    corpus = synthetic_corpus(args.docs, args.pages, rng)
+    facts = plant_facts(corpus, rng, per_doc=max(1, args.questions // args.docs))
+    q.save_many_to_qdrant((name, pages, None, None) for name, pages in corpus)
+    chunks_by_file = {name: q.get_document_chunks(name) for name, _ in corpus}
+
+    questions = build_questions(chunks_by_file, facts, args.questions, rng)
+
+    embedder = "OpenAI" if args.openai else "hash"
+    print(f"{args.docs} docs x {args.pages} pages, {embedder} embeddings, {len(questions)} questions, seed {args.seed}")
+    print(f"{'kind':8} {'mode':7} {'hit@1':>6} {'hit@' + str(args.k):>6} {'tokens/answer':>14}")
+    for kind in ("acronym", "number", "passage", "all"):
+        for mode in ("dense", "hybrid"):
+            totals = defaultdict(float)
+            asked = [item for item in questions if kind in ("all", item[0])]
+            for _, filename, question, answer_chunks in asked:
+                passages = q.search_passages(question, filename, args.max_k, mode=mode).result()
+                ranks = [rank for rank, (_, p) in enumerate(passages) if p["chunk_index"] in answer_chunks]
+                used = passages[:ranks[0] + 1] if ranks else passages
+                totals["hit@1"] += bool(ranks) and ranks[0] < 1
+                totals["hit@k"] += bool(ranks) and ranks[0] < args.k
+                totals["tokens"] += sum(p.get("token_count") or 0 for _, p in used)
+            n = len(asked)
+            print(f"{kind:8} {mode:7} {totals['hit@1'] / n:6.3f} {totals['hit@k'] / n:6.3f} {totals['tokens'] / n:14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Peak memory and wall time of ingesting one very large document.
+
+Compares two ways of moving a synthetic multi-megabyte document through
+extract -> chunk -> embed -> upsert -> blob store:
+  * whole     - the old path: all pages collected, joined into one string, chunked into a
+                list, every point (with its vector) built before upserting, text stored at once
+  * streaming - the current path: save_to_qdrant() itself, wired up as in bench_offline
+                (cached hash embeddings, catalog, blob store); pages are chunked as they
+                arrive, the text is streamed into a staged blob, and points go through the
+                bounded embedding pipeline
+
+Each mode runs in its own subprocess, with the app loaded in both, so peak RSS
+(ru_maxrss) is measured independently.
+Both embed with 1536-dim hash embeddings in-process and the upsert sink only counts
+points, so the numbers reflect the ingestion path and not the vector database.
+
+    python -m benchmarks.bench_large_document --chars 5000000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from benchmarks.bench_offline import offline_app
+from service.blob_store import BlobStore
+from service.chunking import StructuredChunker
+from service.embedding_providers import HashEmbeddings
+
+DIM = 1536
+PAGE_CHARS = 3000
+SENTENCE = "The lecture develops the {topic} model step by step and works through example {n}. "
+TOPICS = ["graph", "matrix", "protein", "market", "circuit", "poem", "enzyme", "orbit"]
+
+
+def synthetic_pages(n_chars):
+    """Yield (page_number, text) pairs until n_chars have been produced."""
+    produced, page_number, n = 0, 0, 0
+    while produced < n_chars:
+        page_number += 1
+        parts, size = [], 0
+        if page_number % 20 == 1:
+            parts.append(f"Chapter {page_number // 20 + 1}\n\n")
+        while size < PAGE_CHARS:
+            paragraph = "".join(SENTENCE.format(topic=TOPICS[(n + i) % len(TOPICS)], n=n + i) for i in range(5))
+            n += 5
+            parts.append(paragraph + "\n\n")
+            size += len(paragraph) + 2
+        text = "".join(parts)
+        produced += len(text)
+        yield page_number, text
+
+
+def run_whole(n_chars):
+    pages = list(synthetic_pages(n_chars))
+    text = "\n".join(page_text for _, page_text in pages).strip()
+    chunks = list(StructuredChunker().chunk(text))
+    embeddings = HashEmbeddings(DIM)
+    points = []
+    for i, chunk in enumerate(chunks):
+        vector = embeddings.embed_documents([chunk.text])[0]
+        points.append({"id": str(uuid.uuid4()), "vector": vector, "payload": {"chunk_index": i, "chunk_text": chunk.text}})
+    with tempfile.TemporaryDirectory() as root:
+        BlobStore(root).put(points[0]["id"], text)
+    return len(points)
+
+
+def run_streaming(n_chars, q):
+    upserted = []
+    q._upsert = lambda points: upserted.append(len(points))   # count instead of storing
+    q.save_to_qdrant(synthetic_pages(n_chars), "large-document.pdf")
+    return sum(upserted)
+
+
+def child(mode, n_chars):
+    # Both modes load the app so its imports count towards peak RSS alike
+    q = offline_app()
+    q.ensure_collection()
+    start = time.perf_counter()
+    points = run_whole(n_chars) if mode == "whole" else run_streaming(n_chars, q)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(json.dumps({"mode": mode, "points": points, "seconds": elapsed, "peak_mb": peak_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=5_000_000)
+    parser.add_argument("--mode", choices=["whole", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        child(args.mode, args.chars)
+        return
+
+    print(f"Document: {args.chars / 1e6:.1f}M chars")
+    baseline = None
+    for mode in ("whole", "streaming"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_large_document", "--mode", mode, "--chars", str(args.chars)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        line = f"  {mode:9}: {result['points']:6} points  {result['seconds']:6.2f}s  peak RSS {result['peak_mb']:7.1f} MB"
+        if baseline:
+            line += f"  ({result['peak_mb'] / baseline:.2f}x of whole)"
+        else:
+            baseline = result["peak_mb"]
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Offline, reproducible performance suite for ingestion and retrieval.
+
+Runs the app's own service.qdrant_utils functions against embedded Qdrant (in memory, or
+on disk in a temporary directory with --mode local) and deterministic hash embeddings,
+so it needs no network, no Qdrant server, no API key and no secrets. Every run with the
+same arguments ingests the same synthetic corpus and asks the same questions.
+
+Reports
+  * ingest       - save_many_to_qdrant over the corpus: documents, chunks and chunks/s
+  * 1-by-1       - the same number of documents (fresh text, so the embedding cache helps
+                   neither) stored with one save_to_qdrant call each, as before bulk upload
+  * list         - list_qdrant_docs() latency
+  * search       - search_passages() p50/p99 and hit@k (the chunk a question was taken
+                   from is among the k results)
+  * text         - get_document_text() latency
+  * update       - update_document() with one page changed
+  * delete       - delete_document()
+
+    python -m benchmarks.bench_offline [--mode local] [--docs 50] [--pages 20] [--latency 0.05]
+
+--latency adds a sleep per embedding request to stand in for the API.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = (
+    "system process data model energy cell market policy signal network structure theory "
+    "method sample region pressure current value function layer protein climate budget "
+    "circuit enzyme contract voltage gradient tissue inflation vector frequency membrane"
+).split()
+COMMON = "the of and to in is that for on with as by this are from an be at which".split()
+
+
+def synthetic_corpus(docs, pages, rng):
+    """docs documents of pages pages each; every document leans on its own topic words."""
+    corpus = []
+    for d in range(docs):
+        topic = rng.sample(WORDS, 6) + [f"term{d}x{i}" for i in range(10)]
+        doc_pages = []
+        for page in range(1, pages + 1):
+            paragraphs = []
+            for _ in range(rng.randint(3, 6)):
+                sentences = []
+                for _ in range(rng.randint(3, 7)):
+                    words = [rng.choice(topic) if rng.random() < 0.5 else rng.choice(COMMON) for _ in range(rng.randint(8, 18))]
+                    sentences.append(" ".join(words).capitalize() + ".")
+                paragraphs.append(" ".join(sentences))
+            doc_pages.append((page, "\n\n".join(paragraphs)))
+        corpus.append((f"doc-{d:04d}.pdf", doc_pages))
+    return corpus
+
+
+def offline_app(mode="memory", latency=0.0):
+    """
+    Import service.qdrant_utils wired to embedded Qdrant, hash embeddings and stores in a
+    fresh temporary directory. Returns the module.
+    """
+    workdir = tempfile.mkdtemp(prefix="quizzer-bench-")
+    settings = {
+        "QDRANT_MODE": mode,
+        "QDRANT_PATH": os.path.join(workdir, "qdrant"),
+        "EMBEDDING_PROVIDER": "hash",
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embeddings.sqlite3"),
+        "BLOB_STORE_PATH": os.path.join(workdir, "blobs"),
+        "CATALOG_PATH": os.path.join(workdir, "catalog.sqlite3"),
+        "ANSWER_CACHE_PATH": os.path.join(workdir, "answers.sqlite3"),
+    }
+    os.environ.update(settings)
+
+    import service.qdrant_utils as q
+    from qdrant_client import QdrantClient
+    from service.blob_store import BlobStore
+    from service.document_catalog import DocumentCatalog
+    from service.answer_cache import AnswerCache
+    from service.embedding_cache import EmbeddingCache, CachedEmbeddings
+    from service.embedding_providers import HashEmbeddings
+
+    # Secrets take precedence over the environment; pin every resource so a secrets file
+    # can never point the suite at a real server or the real stores
+    q.QDRANT_ASYNC = False
+    q.client.override(QdrantClient(":memory:") if mode == "memory" else QdrantClient(path=settings["QDRANT_PATH"]))
+    q.embeddings.override(CachedEmbeddings(
+        HashEmbeddings(q.EMBEDDING_DIM, latency=latency), EmbeddingCache(settings["EMBEDDING_CACHE_PATH"])
+    ))
+    q.blob_store.override(BlobStore(settings["BLOB_STORE_PATH"]))
+    q.catalog.override(DocumentCatalog(settings["CATALOG_PATH"]))
+    q.answer_cache.override(AnswerCache(settings["ANSWER_CACHE_PATH"]))
+
+    return q
+
+
+def timed(fn, repeat=1):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, samples
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def row(name, samples, extra=""):
+    print(f"{name:8} {statistics.median(samples):10.2f} {percentile(samples, 0.99):10.2f}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["memory", "local"], default="memory")
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per embedding request")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    q = offline_app(args.mode, args.latency)
+
+    rng = random.Random(args.seed)
+    corpus = synthetic_corpus(args.docs, args.pages, rng)
+    chars = sum(len(text) for _, pages in corpus for _, text in pages)
+    print(f"{args.mode} Qdrant, hash embeddings, {args.docs} docs x {args.pages} pages ({chars / 1e6:.1f}M chars), seed {args.seed}")
+    print(f"{'step':8} {'p50 ms':>10} {'p99 ms':>10}")
+
+    report, samples = timed(lambda: q.save_many_to_qdrant((name, pages, None, None) for name, pages in corpus))
+    chunks = sum(entry["chunks"] for entry in report)
+    bulk_ms = samples[0]
+    row("ingest", samples, f"{len(report)} docs, {chunks} chunks, {chunks / (bulk_ms / 1000):.0f} chunks/s")
+
+    sequential = [(name.replace("doc-", "seq-"), pages)
+                  for name, pages in synthetic_corpus(args.docs, args.pages, random.Random(args.seed + 1))]
+    ids, samples = timed(lambda: [q.save_to_qdrant(pages, name) for name, pages in sequential])
+    seq_chunks = sum(len(point_ids) for point_ids in ids)
+    row("1-by-1", samples, f"{len(ids)} docs, {seq_chunks} chunks, {seq_chunks / (samples[0] / 1000):.0f} chunks/s, "
+                           f"bulk {samples[0] * chunks / (bulk_ms * seq_chunks):.2f}x faster")
+    for point_ids in ids:
+        q.delete_document(point_ids[0])
+
+    docs, samples = timed(q.list_qdrant_docs, repeat=50)
+    row("list", samples, f"{len(docs)} documents")
+
+    chunks_by_file = {name: q.get_document_chunks(name) for name, _ in corpus}
+    questions = []
+    for _ in range(args.queries):
+        name = rng.choice(list(chunks_by_file))
+        index = rng.randrange(len(chunks_by_file[name]))
+        sentences = [s for s in chunks_by_file[name][index].split(".") if len(s.split()) > 5]
+        questions.append((name, index, rng.choice(sentences)))
+    hits = 0
+    samples = []
+    for name, index, question in questions:
+        passages, (ms,) = timed(lambda: q.search_passages(question, name, args.k).result())
+        samples.append(ms)
+        hits += any(payload["chunk_index"] == index for _, payload in passages)
+    row("search", samples, f"hit@{args.k} {hits / len(questions):.3f}")
+
+    document_ids = [entry["document_id"] for entry in report]
+    _, samples = timed(lambda: q.get_document_text(rng.choice(document_ids)), repeat=50)
+    row("text", samples)
+
+    name, pages = corpus[0]
+    revised = pages[:-1] + [(pages[-1][0], pages[-1][1] + "\n\nA newly added closing paragraph.")]
+    summary, samples = timed(lambda: q.update_document(report[0]["document_id"], revised))
+    row("update", samples, f"{summary['unchanged']} unchanged, {summary['added']} added, {summary['removed']} removed")
+
+    count, samples = timed(lambda: q.delete_document(report[-1]["document_id"]))
+    row("delete", samples, f"{count} points")
+    print(f"embedding cache: {q.embedding_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark parallel PDF extraction on generated PDFs across 1/2/4/8 workers.
+
+For every page count and worker count it reports the first extraction (cold: the shared
+pool is started, each worker imports fitz, pdfplumber and docx) and the best of the
+following --repeat ones (warm: what every later upload pays), with the warm speedup over
+one process. PARALLEL_MIN_PAGES should sit where the warm speedup passes 1 on the
+deployment's hardware; the usable CPU count is printed since it bounds the speedup.
+
+    python -m benchmarks.bench_pdf_extraction --pages 40,120,500
+"""
+import argparse
+import io
+import time
+
+import fitz  # PyMuPDF
+
+from service.extract_text import iter_pdf_pages, iter_pdf_pages_parallel, usable_cpus
+
+PARAGRAPH = (
+    "Section {page}.{n}: The quick brown fox jumps over the lazy dog while the lecturer "
+    "explains eigenvalues, recursion and the central limit theorem with worked examples. "
+)
+
+
+def generate_pdf(pages):
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        text = "".join(PARAGRAPH.format(page=page_number, n=n) for n in range(25))
+        page.insert_textbox(fitz.Rect(36, 36, 576, 806), text, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def time_extraction(pdf_bytes, workers):
+    start = time.perf_counter()
+    if workers == 1:
+        pages = list(iter_pdf_pages(io.BytesIO(pdf_bytes)))
+    else:
+        pages = list(iter_pdf_pages_parallel(io.BytesIO(pdf_bytes), workers=workers, min_pages=0))
+    return time.perf_counter() - start, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="40,120,500")
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{usable_cpus()} usable CPUs")
+    print(f"{'pages':>6} {'workers':>7} {'cold s':>7} {'warm s':>7} {'pages/sec':>10} {'speedup':>8}")
+    cold_pools = set()
+    for page_count in map(int, args.pages.split(",")):
+        pdf_bytes = generate_pdf(page_count)
+        baseline = None
+        reference = None
+        for workers in map(int, args.workers.split(",")):
+            cold, pages = time_extraction(pdf_bytes, workers)
+            if workers in cold_pools:
+                cold = None   # this pool was started by a previous page count
+            cold_pools.add(workers)
+            best = min(time_extraction(pdf_bytes, workers)[0] for _ in range(args.repeat))
+            if reference is None:
+                reference = pages
+            elif pages != reference:
+                raise SystemExit(f"workers={workers} produced different text than workers=1")
+            baseline = baseline or best
+            cold_text = f"{cold:7.2f}" if cold is not None else f"{'-':>7}"
+            print(f"{page_count:>6} {workers:>7} {cold_text} {best:>7.2f} {page_count / best:>10.1f} {baseline / best:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
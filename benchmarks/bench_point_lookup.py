@@ -0,0 +1,112 @@
+"""
+Latency of document lookups as the collection grows.
+
+Seeds a Qdrant collection with documents of --chunks chunks each, up to 100k points, and
+times at several collection sizes:
+  * legacy scan  - the old get_document_text: scroll 1000 points and search them in Python
+                   (also reports whether the document was found at all)
+  * retrieve     - direct lookup of the chunk-0 point by id
+  * chunks       - every chunk of one file via the filtered, paginated filename scroll
+  * catalog      - list_documents over the chunk_index == 0 filter
+
+The default target is a local in-memory Qdrant. Local mode keeps no payload indexes and
+evaluates filters by scanning, so the filtered rows only flatten out against a server
+(pass --url, e.g. http://localhost:6333); retrieve is flat in both.
+
+    python -m benchmarks.bench_point_lookup [--sizes 10000,50000,100000] [--url URL]
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from service.qdrant_queries import list_documents, retrieve_payload, chunk_texts, match_filter
+
+COLLECTION = "bench_lookup"
+DIM = 4  # lookups never touch vectors
+
+
+def seed(client, start_doc, end_doc, chunks_per_doc):
+    points = []
+    for d in range(start_doc, end_doc):
+        document_id = str(uuid.UUID(int=d + 1))
+        for c in range(chunks_per_doc):
+            point_id = document_id if c == 0 else str(uuid.uuid4())
+            payload = {"document_id": document_id, "filename": f"doc-{d}.pdf", "chunk_index": c,
+                       "chunk_text": f"chunk {c} of document {d}"}
+            if c == 0:
+                payload["upload_timestamp"] = "2024-01-01T00:00:00"
+            points.append(models.PointStruct(id=point_id, vector=[0.1, 0.2, 0.3, 0.4], payload=payload))
+            if len(points) == 1024:
+                client.upsert(collection_name=COLLECTION, points=points)
+                points = []
+    if points:
+        client.upsert(collection_name=COLLECTION, points=points)
+
+
+def legacy_scan(client, point_id):
+    points, _ = client.scroll(collection_name=COLLECTION, limit=1000, with_payload=True, with_vectors=False)
+    for p in points:
+        if p.id == point_id:
+            return p.payload
+    return None
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,50000,100000", help="collection sizes in points")
+    parser.add_argument("--chunks", type=int, default=20, help="chunks per document")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--url", help="Qdrant server; defaults to a local in-memory instance")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(":memory:")
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE)
+    )
+    for field_name, schema in (("filename", models.PayloadSchemaType.KEYWORD),
+                               ("document_id", models.PayloadSchemaType.KEYWORD),
+                               ("chunk_index", models.PayloadSchemaType.INTEGER)):
+        client.create_payload_index(collection_name=COLLECTION, field_name=field_name, field_schema=schema)
+
+    print(f"{'points':>8} {'legacy scan ms':>15} {'found':>6} {'retrieve ms':>12} {'chunks ms':>10} {'catalog ms':>11}")
+    docs = 0
+    for size in [int(s) for s in args.sizes.split(",")]:
+        target_docs = size // args.chunks
+        seed(client, docs, target_docs, args.chunks)
+        docs = target_docs
+
+        # Look up the most recently added document
+        d = docs - 1
+        point_id = str(uuid.UUID(int=d + 1))
+        scan_ms, found = timed(lambda: legacy_scan(client, point_id), args.repeat)
+        retrieve_ms, _ = timed(lambda: retrieve_payload(client, COLLECTION, point_id, ["chunk_text"]), args.repeat)
+        chunks_ms, chunks = timed(
+            lambda: chunk_texts(client, COLLECTION, match_filter(filename=f"doc-{d}.pdf")), args.repeat
+        )
+        assert len(chunks) == args.chunks
+        catalog_ms, catalog = timed(lambda: list_documents(client, COLLECTION), 1)
+        assert len(catalog) == docs
+        print(f"{size:>8} {scan_ms:>15.2f} {'yes' if found else 'no':>6} {retrieve_ms:>12.3f} {chunks_ms:>10.2f} {catalog_ms:>11.1f}")
+
+    client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Compare Qdrant client modes: REST vs gRPC, sync vs async.
+
+For each mode this measures
+  * upsert throughput - --points random vectors in --batch-size batches; the sync client
+    sends one batch at a time, the async client keeps --concurrency batches in flight
+    (as ingestion does through embed_and_upsert)
+  * search latency    - p50/p99 of --queries filtered nearest-neighbour queries, sent one
+    at a time, and the wall time of sending them --concurrency at a time (async only)
+
+Needs a running Qdrant server, e.g.
+
+    docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+    python -m benchmarks.bench_qdrant_transport --url http://localhost:6333
+
+With --url :memory: the local in-process mode is used instead; it has no transport, so
+only the sync/async rows are meaningful there.
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http import models
+
+from service.embedding_pipeline import batched
+from service.qdrant_async import AsyncQdrant
+from service.qdrant_queries import match_filter
+
+COLLECTION = "bench_transport"
+FILES = 20
+
+
+def random_points(n, dim, rng):
+    return [
+        models.PointStruct(
+            id=str(uuid.uuid4()),
+            vector=[rng.uniform(-1, 1) for _ in range(dim)],
+            payload={"filename": f"doc-{i % FILES}.pdf", "chunk_index": i, "chunk_text": f"chunk {i}"}
+        )
+        for i in range(n)
+    ]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def reset(client, dim):
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE)
+    )
+    client.create_payload_index(COLLECTION, "filename", models.PayloadSchemaType.KEYWORD)
+
+
+def bench_sync(client, points, queries, batch_size):
+    start = time.perf_counter()
+    for batch in batched(points, batch_size):
+        client.upsert(collection_name=COLLECTION, points=batch, wait=True)
+    upsert_s = time.perf_counter() - start
+
+    latencies = []
+    for i, vector in enumerate(queries):
+        start = time.perf_counter()
+        client.query_points(COLLECTION, query=vector, query_filter=match_filter(filename=f"doc-{i % FILES}.pdf"), limit=4)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return upsert_s, latencies, None
+
+
+def bench_async(aclient, points, queries, batch_size, concurrency):
+    start = time.perf_counter()
+    in_flight = []
+    for batch in batched(points, batch_size):
+        if len(in_flight) >= concurrency:
+            done, pending = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+            in_flight = list(pending)
+        in_flight.append(aclient.upsert(COLLECTION, batch))
+    for future in in_flight:
+        future.result()
+    upsert_s = time.perf_counter() - start
+
+    latencies = []
+    for i, vector in enumerate(queries):
+        start = time.perf_counter()
+        aclient.search(COLLECTION, vector, 4, match_filter(filename=f"doc-{i % FILES}.pdf")).result()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for window in batched(enumerate(queries), concurrency):
+        futures = [aclient.search(COLLECTION, v, 4, match_filter(filename=f"doc-{i % FILES}.pdf")) for i, v in window]
+        for future in futures:
+            future.result()
+    concurrent_s = time.perf_counter() - start
+    return upsert_s, latencies, concurrent_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:6333")
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    points = random_points(args.points, args.dim, rng)
+    queries = [[rng.uniform(-1, 1) for _ in range(args.dim)] for _ in range(args.queries)]
+
+    if args.url == ":memory:":
+        modes = [("local", False)]
+    else:
+        modes = [("REST", False), ("gRPC", True)]
+
+    print(f"{args.points} points x {args.dim} dims, batch {args.batch_size}, {args.queries} queries, concurrency {args.concurrency}")
+    print(f"{'mode':12} {'upsert pts/s':>13} {'search p50 ms':>14} {'p99 ms':>8} {'concurrent q/s':>15}")
+    for transport, prefer_grpc in modes:
+        if transport == "local":
+            client = QdrantClient(":memory:")
+            aclient = AsyncQdrant(lambda: AsyncQdrantClient(":memory:"))
+        else:
+            client = QdrantClient(url=args.url, prefer_grpc=prefer_grpc, grpc_port=args.grpc_port)
+            aclient = AsyncQdrant.connect(args.url, prefer_grpc=prefer_grpc, grpc_port=args.grpc_port)
+
+        reset(client, args.dim)
+        results = [("sync", bench_sync(client, points, queries, args.batch_size))]
+        if transport == "local":
+            # The async local client keeps its own in-memory storage
+            aclient.run(lambda c: c.create_collection(
+                COLLECTION, vectors_config=models.VectorParams(size=args.dim, distance=models.Distance.COSINE)
+            ))
+        else:
+            reset(client, args.dim)
+        results.append(("async", bench_async(aclient, points, queries, args.batch_size, args.concurrency)))
+
+        for mode, (upsert_s, latencies, concurrent_s) in results:
+            concurrent = f"{len(queries) / concurrent_s:15.0f}" if concurrent_s else f"{'-':>15}"
+            print(
+                f"{transport + ' ' + mode:12} {len(points) / upsert_s:13.0f} "
+                f"{statistics.median(latencies):14.2f} {percentile(latencies, 0.99):8.2f} {concurrent}"
+            )
+        client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
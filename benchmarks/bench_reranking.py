@@ -0,0 +1,113 @@
+"""
+Added latency vs answer quality of the retrieval stage (over-fetch, rerank, MMR) on the Learn page.
+
+A seeded synthetic corpus with planted facts (see bench_hybrid) is ingested offline, with a
+share of every document's pages repeated near-verbatim (one sentence dropped), as slides
+and handouts repeat definitions and summaries. Every question is then asked through
+search_passages() with each retrieval stage:
+  * top-k           - the search's own first k (no over-fetch, no MMR)
+  * mmr <lambda>    - RETRIEVAL_CANDIDATES candidates, MMR over their dense vectors
+  * bm25 + mmr      - candidates rescored by BM25 among themselves, then MMR
+  * cross-encoder   - candidates rescored by a local cross-encoder, then MMR (needs
+                      fastembed and a model download; skipped otherwise)
+Reports hit@k (a chunk holding the answer is among the k passages), duplicates per
+question (passages mostly repeating an earlier one, see context_packing.shingles), the
+prompt tokens they waste, and search latency with the ms added over top-k.
+
+    python -m benchmarks.bench_reranking [--docs 20] [--pages 20] [--duplicates 0.3] [--k 4] [--lambdas 0.7,0.5]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.bench_hybrid import plant_facts, build_questions
+from benchmarks.bench_offline import synthetic_corpus, offline_app, percentile
+from service.context_packing import shingles
+from service.reranking import RetrievalStage, create_reranker
+
+
+def with_duplicates(corpus, rng, share):
+    """Append near-copies of a share of each document's pages (one sentence dropped) as new pages."""
+    for _, pages in corpus:
+        for _, text in rng.sample(pages, int(share * len(pages))):
+            sentences = text.split(". ")
+            if len(sentences) > 2:
+                sentences.pop(rng.randrange(len(sentences)))
+            pages.append((len(pages) + 1, ". ".join(sentences)))
+    return corpus
+
+
+def redundant(passages, threshold=0.7):
+    """Passages whose shingles are mostly in one earlier passage."""
+    seen, repeated = [], []
+    for text, payload in passages:
+        own = shingles(text)
+        if own and any(len(own & earlier) >= threshold * len(own) for earlier in seen):
+            repeated.append((text, payload))
+        seen.append(own)
+    return repeated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--duplicates", type=float, default=0.3, help="share of pages repeated")
+    parser.add_argument("--questions", type=int, default=100, help="per kind")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--lambdas", default="0.7,0.5", help="MMR_LAMBDA values to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    q = offline_app()
+    rng = random.Random(args.seed)
+    corpus = synthetic_corpus(args.docs, args.pages, rng)
+    facts = plant_facts(corpus, rng, per_doc=max(1, args.questions // args.docs))
+    with_duplicates(corpus, rng, args.duplicates)
+    q.save_many_to_qdrant((name, pages, None, None) for name, pages in corpus)
+    chunks_by_file = {name: q.get_document_chunks(name) for name, _ in corpus}
+    questions = []
+    for kind, filename, question, answer_chunks in build_questions(chunks_by_file, facts, args.questions, rng):
+        if kind == "passage":   # the sentence may be in a repeated page too
+            answer_chunks = {i for i, text in enumerate(chunks_by_file[filename]) if question in text}
+        questions.append((kind, filename, question, answer_chunks))
+
+    lambdas = [float(value) for value in args.lambdas.split(",")]
+    stages = [("top-k", lambda: RetrievalStage(0, 1.0))]
+    stages += [(f"mmr {value}", lambda value=value: RetrievalStage(args.candidates, value)) for value in lambdas]
+    stages += [
+        (f"bm25 + mmr {lambdas[0]}", lambda: RetrievalStage(args.candidates, lambdas[0], create_reranker("bm25"))),
+        (f"cross-encoder + mmr {lambdas[0]}", lambda: RetrievalStage(
+            args.candidates, lambdas[0], create_reranker("cross-encoder", cache_dir=q.FASTEMBED_CACHE_PATH)
+        )),
+    ]
+    print(f"{args.docs} docs x {args.pages} pages + {args.duplicates:.0%} repeated, {len(questions)} questions, "
+          f"k={args.k}, {args.candidates} candidates, seed {args.seed}")
+    print(f"{'stage':24} {'hit@k':>6} {'duplicates/q':>13} {'wasted tokens/q':>16} {'ms p50':>7} {'p99':>7} {'added ms':>9}")
+    baseline = None
+    for name, create in stages:
+        try:
+            q.retrieval_stage.override(create())
+        except Exception as e:
+            print(f"{name:24} skipped: {e}")
+            continue
+        hits, duplicates, wasted, latencies = 0, 0, 0, []
+        for _, filename, question, answer_chunks in questions:
+            start = time.perf_counter()
+            passages = q.search_passages(question, filename, args.k).result()
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(p["chunk_index"] in answer_chunks for _, p in passages)
+            repeated = redundant(passages)
+            duplicates += len(repeated)
+            wasted += sum(p.get("token_count") or 0 for _, p in repeated)
+        p50 = statistics.median(latencies)
+        baseline = p50 if baseline is None else baseline
+        n = len(questions)
+        print(f"{name:24} {hits / n:6.3f} {duplicates / n:13.2f} {wasted / n:16.0f} {p50:7.2f} "
+              f"{percentile(latencies, 0.99):7.2f} {p50 - baseline:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
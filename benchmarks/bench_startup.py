@@ -0,0 +1,94 @@
+"""
+Startup and first-paint timing of the Qdrant/embedding layer.
+
+Reports
+  * import      - cold `import service.qdrant_utils` in a fresh interpreter, and what
+                  creating every client up front (as importing used to) would add
+  * bootstrap   - Qdrant round trips and time of five ensure_collection() calls: cached
+                  (once per process) vs checking the collection on every call (as before)
+  * first paint - the Upload Document page rendered with streamlit's AppTest, first and
+                  second run in the same process
+
+Qdrant is an in-memory instance behind a wrapper that adds --rtt ms to every call, to
+stand in for a network round trip. Run from the repo root with the app's secrets available:
+
+    python -m benchmarks.bench_startup [--rtt 20]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from qdrant_client import QdrantClient
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import service.qdrant_utils as q
+imported = time.perf_counter() - start
+for r in (q.client, q.embeddings, q.blob_store, q.catalog):
+    r.instance()
+print(imported, time.perf_counter() - start - imported)
+"""
+
+
+class SlowClient:
+    """Forwards to a QdrantClient, counting calls and sleeping rtt seconds before each."""
+
+    def __init__(self, client, rtt):
+        self._client = client
+        self.rtt = rtt
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self.calls += 1
+            time.sleep(self.rtt)
+            return attr(*args, **kwargs)
+        return call
+
+
+def measure(fn, client):
+    calls = client.calls
+    start = time.perf_counter()
+    fn()
+    return client.calls - calls, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt", type=float, default=20, help="simulated Qdrant round trip in ms")
+    args = parser.parse_args()
+
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], check=True, capture_output=True, text=True).stdout
+    imported, eager = (float(x) for x in out.strip().splitlines()[-1].split())
+    print(f"import service.qdrant_utils:           {imported * 1000:8.0f} ms")
+    print(f"  + creating every client up front:    {eager * 1000:8.0f} ms (now deferred to first use)")
+
+    import service.qdrant_utils as q
+    from streamlit.testing.v1 import AppTest
+
+    client = SlowClient(QdrantClient(":memory:"), args.rtt / 1000)
+    q.client.override(client)
+
+    calls, ms = measure(lambda: [q._bootstrap_collection(q.QDRANT_COLLECTION, q.QDRANT_COLLECTION_PROFILE) for _ in range(5)], client)
+    print(f"5x bootstrap, checked every call:      {ms:8.0f} ms, {calls} Qdrant calls")
+    q.forget_collection()
+    calls, ms = measure(lambda: [q.ensure_collection() for _ in range(5)], client)
+    print(f"5x ensure_collection, cached:          {ms:8.0f} ms, {calls} Qdrant calls")
+
+    for run in ("first", "second"):
+        start = time.perf_counter()
+        calls = client.calls
+        at = AppTest.from_file("pages/doc-management/upload_doc.py", default_timeout=60).run()
+        ms = (time.perf_counter() - start) * 1000
+        status = "error: " + at.exception[0].message if at.exception else "ok"
+        print(f"Upload Document page, {run} paint:    {ms:8.0f} ms, {client.calls - calls} Qdrant calls ({status})")
+
+
+if __name__ == "__main__":
+    main()
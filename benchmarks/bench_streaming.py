@@ -0,0 +1,82 @@
+"""
+Time until students see words: blocking vs streamed chat completions for Learn-page answers.
+
+Against the local fake OpenAI server (benchmarks/fake_openai.py), which streams one
+server-sent event per token after --first-token seconds and then every --per-token
+seconds, this compares
+  * blocking - chat.completions.create() as the page used to call it: nothing is shown
+               until the whole answer is in
+  * streamed - answer_stream.stream_chat() as the page calls it now: text is shown from
+               the first token on
+and checks that both return the same text. With --page the Learn page itself runs
+through streamlit's AppTest (offline Qdrant and hash embeddings, see bench_offline), and
+the timings it records are printed.
+
+    python -m benchmarks.bench_streaming [--requests 20] [--tokens 150] [--page]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from openai import OpenAI
+
+from benchmarks.bench_offline import percentile
+from benchmarks.fake_openai import start_server
+from service.answer_stream import stream_chat
+
+MODEL = "gpt-4o-mini"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=150)
+    parser.add_argument("--first-token", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--per-token", type=float, default=0.02, help="seconds between tokens")
+    parser.add_argument("--page", action="store_true", help="also run pages/student/ask.py end to end")
+    args = parser.parse_args()
+
+    server, base_url = start_server(first_token_latency=args.first_token, token_latency=args.per_token, chat_tokens=args.tokens)
+    client = OpenAI(api_key="fake", base_url=base_url)
+    # The client connects lazily; open the connection before timing anything
+    client.chat.completions.create(model=MODEL, messages=[{"role": "user", "content": "warm up"}])
+
+    blocking, first, streamed, mismatches = [], [], [], 0
+    for i in range(args.requests):
+        messages = [{"role": "user", "content": f"question {i}"}]
+        start = time.perf_counter()
+        text = client.chat.completions.create(model=MODEL, messages=messages, temperature=0.2).choices[0].message.content
+        blocking.append(time.perf_counter() - start)
+
+        stream = stream_chat(client, messages, MODEL)
+        for _ in stream:
+            pass
+        first.append(stream.first_token)
+        streamed.append(stream.total)
+        mismatches += stream.text != text
+
+    print(f"{args.requests} answers of {args.tokens} tokens, first token after {args.first_token}s, {args.per_token}s per token")
+    print(f"{'mode':10} {'first text p50 s':>17} {'p99 s':>7} {'complete p50 s':>15}")
+    print(f"{'blocking':10} {statistics.median(blocking):17.2f} {percentile(blocking, 0.99):7.2f} {statistics.median(blocking):15.2f}")
+    print(f"{'streamed':10} {statistics.median(first):17.2f} {percentile(first, 0.99):7.2f} {statistics.median(streamed):15.2f}")
+    print(f"streamed text differs from blocking text in {mismatches} of {args.requests} answers")
+
+    if args.page:
+        # The page's OpenAI client picks the fake server up from the environment
+        os.environ["OPENAI_BASE_URL"] = base_url
+        from streamlit.testing.v1 import AppTest
+        from benchmarks.bench_offline import offline_app
+        q = offline_app()
+        q.save_to_qdrant("The XQR7 relay stands for extra quick relay. " * 40, "streaming.txt")
+        for question in ("What does XQR7 stand for?", "what does XQR7 stand for"):
+            at = AppTest.from_file("pages/student/ask.py", default_timeout=60).run()
+            at.text_input[0].input(question)
+            at.button[0].click().run()
+            error = f" error: {at.exception[0].message}" if at.exception else ""
+            print(f"page '{question}': {at.caption[-1].value}{error}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Local stand-in for the OpenAI HTTP API (embeddings and chat completions, streamed or not),
+used by the benchmarks.
+
+Run standalone with `python -m benchmarks.fake_openai --port 8765` or start it in-process
+with `start_server()`.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_answer(messages, tokens):
+    """Deterministic answer of `tokens` words for a conversation, as a list of text deltas."""
+    seed = int.from_bytes(hashlib.sha256(json.dumps(messages).encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    words = "the answer is found in the passage about this topic according to context".split()
+    return [("" if i == 0 else " ") + rng.choice(words) for i in range(tokens)]
+
+
+def fake_vector(text, dim):
+    """Deterministic pseudo-embedding for `text`."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) for _ in range(dim)]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    # Latency settings and the request counter live on the server instance (see start_server)
+    server_version = "FakeOpenAI/0.1"
+    disable_nagle_algorithm = True   # send each streamed token right away
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, body, status=200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.endswith("/embeddings"):
+            self._handle_embeddings(request)
+        elif self.path.endswith("/chat/completions"):
+            self._handle_chat(request)
+        else:
+            self._send_json({"error": {"message": f"unknown path {self.path}"}}, status=404)
+
+    def _handle_embeddings(self, request):
+        inputs = request.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = request.get("dimensions") or self.server.dim
+        time.sleep(self.server.request_latency + self.server.per_input_latency * len(inputs))
+        self.server.requests += 1
+        data = [
+            {"object": "embedding", "index": i, "embedding": fake_vector(str(text), dim)}
+            for i, text in enumerate(inputs)
+        ]
+        self._send_json({
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "fake"),
+            "usage": {"prompt_tokens": 0, "total_tokens": 0}
+        })
+
+
+    def _handle_chat(self, request):
+        self.server.requests += 1
+        deltas = fake_answer(request.get("messages", []), self.server.chat_tokens)
+        model = request.get("model", "fake")
+        if not request.get("stream"):
+            time.sleep(self.server.first_token_latency + self.server.token_latency * len(deltas))
+            self._send_json({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(deltas)}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(deltas), "total_tokens": len(deltas)}
+            })
+            return
+
+        # Server-sent events, one chunk per token, like the real API with stream=True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        time.sleep(self.server.first_token_latency)
+        event({"role": "assistant", "content": ""})
+        for i, delta in enumerate(deltas):
+            if i:
+                time.sleep(self.server.token_latency)
+            event({"content": delta})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def start_server(port=0, dim=1536, request_latency=0.08, per_input_latency=0.001,
+                 first_token_latency=0.5, token_latency=0.02, chat_tokens=150):
+    """
+    Start the fake server on a background thread. Returns (server, base_url).
+
+    Chat completions take first_token_latency before the first token and token_latency
+    per further token, streamed or all at once.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.dim = dim
+    server.request_latency = request_latency
+    server.per_input_latency = per_input_latency
+    server.first_token_latency = first_token_latency
+    server.token_latency = token_latency
+    server.chat_tokens = chat_tokens
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latency", type=float, default=0.08, help="seconds per request")
+    args = parser.parse_args()
+    server, url = start_server(args.port, args.dim, args.latency)
+    print(f"Fake OpenAI API listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -3,27 +3,53 @@ import pandas as pd
 import ast
 from datetime import datetime
 import time
-from service.qdrant_utils import list_qdrant_docs, delete_multiple_from_qdrant
-from service.track_quiz import get_document_index
-from service.track_results import int_keys_to_str, load_results_by_document
+from service.qdrant_utils import list_qdrant_docs, delete_document
+from service.ingest_jobs import get_ingest_queue
+from service.extract_text import file_type_of
+from service.track_quiz import get_document_index, delete_quizzes_by_document
+from service.track_results import int_keys_to_str, load_results_by_document, archive_results_by_document
 
 
 @st.dialog("Confirm Delete")
 def confirm_delete(document):
     st.write(f"Delete {document['filename']} (uploaded on {document['upload_timestamp']})? ")
+    st.caption("All of its chunks and quizzes are removed; its quiz results are moved to the results archive.")
     if st.button("Confirm"):
         print(f"Confirm delete {document['filename']}")
-        success = False
         with st.spinner(f"Deleting {document['filename']}..."):
-            success = delete_multiple_from_qdrant([document["point_id"]])
-            time.sleep(1.5)
-        if success:
-            st.success(f"Deleted {document['filename']}.")
+            points = delete_document(document["point_id"])
+            quizzes = results = 0
+            if points is not None:
+                try:
+                    quizzes = delete_quizzes_by_document(document["point_id"])
+                    results = archive_results_by_document(document["point_id"])
+                except Exception as e:
+                    st.error(f"Deleted the document, but failed to clean up its quizzes and results: {e}")
+        if points is not None:
+            st.success(
+                f"Deleted {document['filename']}: {points} chunks, {quizzes} quizzes removed, {results} results archived."
+            )
             st.session_state.reload_docs = True
             time.sleep(1.5)
             st.rerun()
 
 
+@st.dialog("Update Document")
+def update_document_dialog(document):
+    st.write(f"Upload a revised version of {document['filename']}. Only changed passages are re-embedded, and existing quizzes stay linked.")
+    revised = st.file_uploader("Select the revised document (PDF, DOCX, TXT)", type=["pdf", "docx", "txt"])
+    large_mode = st.checkbox("Large document mode", help=f"Allow up to {LARGE_DOC_MAX_CHARS:,} characters.")
+    if revised and st.button("Update"):
+        job = get_ingest_queue().submit(
+            revised.name,
+            file_type_of(revised.name),
+            revised.getvalue(),
+            max_chars=LARGE_DOC_MAX_CHARS if large_mode else MAX_DOC_SIZE,
+            document_id=document["point_id"]
+        )
+        st.success(f"Update queued (job {job.job_id}). Track it on the Upload Document page.")
+
+
 @st.dialog("Results", width="large")
 def view_result(result):
     if not result:
@@ -56,6 +82,7 @@ def view_result(result):
             hide_index=True)
 
 MAX_DOC_SIZE = 500_000  # max characters (approx 50-70 pages of text)
+LARGE_DOC_MAX_CHARS = 20_000_000  # large document mode
 
 st.title('Documents')
 
@@ -103,6 +130,9 @@ with st.container(horizontal=True, width='stretch', horizontal_alignment='left')
                     if st.button("", icon=':material/delete:', key=f"delete-{document['point_id']}", use_container_width=True):
                         print(f"To delete {document['filename']}")
                         confirm_delete(document)
+                    if st.button("", icon=':material/upgrade:', key=f"update-{document['point_id']}", use_container_width=True, help="Upload a revised version"):
+                        print(f"To update {document['filename']}")
+                        update_document_dialog(document)
                 with st.container(horizontal=True, horizontal_alignment='left'): 
                     if st.button("Generate Quiz", icon=":material/psychology:", key=f"generate-quiz-{document['point_id']}", width=155, type='primary'):
                         print(f"Generating quiz for {document['point_id']}")
@@ -1,10 +1,73 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from service.extract_text import extract_text
-from service.qdrant_utils import list_qdrant_docs, save_to_qdrant, delete_multiple_from_qdrant
+from service.qdrant_utils import list_qdrant_docs
+from service.ingest_jobs import get_ingest_queue
+from service.extract_text import iter_archive, file_type_of
 
 MAX_DOC_SIZE = 500_000  # max characters (approx 50-70 pages of text)
+LARGE_DOC_MAX_CHARS = 20_000_000  # large document mode: whole textbooks, ingested as a stream
+
+STATUS_ICONS = {
+    "queued": ":material/schedule:",
+    "running": ":material/progress_activity:",
+    "done": ":material/check_circle:",
+    "failed": ":material/error:"
+}
+
+# === Ingestion jobs ===
+@st.fragment(run_every=2)
+def job_panel():
+    queue = get_ingest_queue()
+    jobs = queue.jobs()
+    if not jobs:
+        st.caption("No ingestion jobs yet.")
+        return
+
+    # Refresh the document list once a job finishes (failed bulk jobs may still have stored files)
+    seen = st.session_state.setdefault("finished_jobs", set())
+    newly_done = {f"{j.job_id}-{j.attempts}" for j in jobs if j.status in ("done", "failed")} - seen
+    if newly_done:
+        seen.update(newly_done)
+        st.session_state.reload_docs = True
+        st.rerun(scope="app")
+
+    for job in jobs:
+        with st.container(border=True):
+            with st.container(horizontal=True, vertical_alignment='center'):
+                st.markdown(f"{STATUS_ICONS[job.status]} **{job.filename}**")
+                st.caption(f"Job {job.job_id} · {job.status} · stage: {job.stage}")
+                if job.status == "failed":
+                    if st.button("Retry", key=f"retry-{job.job_id}", icon=":material/refresh:"):
+                        queue.retry(job.job_id)
+                        st.rerun(scope="fragment")
+            st.caption(
+                f"Extracted pages: {job.extracted_pages} · "
+                f"Embedded chunks: {job.embedded_chunks} · "
+                f"Upserted points: {job.upserted_points}"
+            )
+            if job.summary:
+                st.caption(job.summary)
+            if job.error:
+                st.error(job.error)
+            if job.report:
+                with st.expander("File report"):
+                    st.dataframe(
+                        pd.DataFrame(job.report)[["filename", "status", "chunks", "error"]].rename(
+                            columns={
+                                "filename": "Document Name",
+                                "status": "Status",
+                                "chunks": "Chunks",
+                                "error": "Error"
+                            }
+                        ),
+                        hide_index=True
+                    )
+
+    if any(j.status == "done" for j in jobs):
+        if st.button("Clear finished jobs"):
+            queue.clear_finished()
+            st.rerun(scope="fragment")
 
 # === UI ===
 def doc_panel():
@@ -16,37 +79,57 @@ def doc_panel():
         st.session_state.reload_docs = True
 
     # --- File Upload Section ---
-    uploaded_file = st.file_uploader("Select a document (PDF, DOCX, TXT)", type=["pdf", "docx", "txt"])
+    uploaded_files = st.file_uploader(
+        "Select documents (PDF, DOCX, TXT) or a ZIP archive of them",
+        type=["pdf", "docx", "txt", "zip"],
+        accept_multiple_files=True
+    )
+
+    large_mode = st.checkbox(
+        "Large document mode",
+        help=f"Allow documents of up to {LARGE_DOC_MAX_CHARS:,} characters (e.g. whole textbooks). "
+             "They are extracted, chunked and stored as a stream, so ingestion takes longer "
+             "but memory use stays flat."
+    )
+    max_chars = LARGE_DOC_MAX_CHARS if large_mode else MAX_DOC_SIZE
 
-    if uploaded_file:
+    if uploaded_files:
         if st.button("Upload"):
-            file_type = uploaded_file.name.split(".")[-1].lower()
-            with st.spinner("Processing file and storing in Qdrant..."):
-                # Extract text safely
-                try:
-                    doc_text = extract_text(uploaded_file, file_type)
-                except Exception as e:
-                    st.error(f"Failed to extract text from this document: {e}")
-                    st.stop()    
-                # Check if text is empty
-                if not doc_text or not doc_text.strip():
-                    st.error("The document could not be processed into text. Nothing was saved.")
+            queue = get_ingest_queue()
+            # Ingestion runs in the background; this page only submits the job
+            if len(uploaded_files) == 1 and file_type_of(uploaded_files[0].name) != "zip":
+                uploaded_file = uploaded_files[0]
+                job = queue.submit(
+                    uploaded_file.name,
+                    file_type_of(uploaded_file.name),
+                    uploaded_file.getvalue(),
+                    {
+                        "filename": uploaded_file.name,
+                        "upload_timestamp": datetime.utcnow().isoformat()
+                    },
+                    max_chars=max_chars
+                )
+                st.toast(f"Queued {uploaded_file.name} (job {job.job_id})", icon=":material/upload_file:")
+            else:
+                # Bulk upload: unpack archives and ingest every file through one shared stream
+                files = []
+                for uploaded_file in uploaded_files:
+                    if file_type_of(uploaded_file.name) == "zip":
+                        try:
+                            files.extend(iter_archive(uploaded_file.getvalue()))
+                        except Exception as e:
+                            st.error(f"Failed to read {uploaded_file.name}: {e}")
+                    else:
+                        files.append((uploaded_file.name, uploaded_file.getvalue()))
+                if files:
+                    job = queue.submit_bulk(files, max_chars=max_chars)
+                    st.toast(f"Queued {len(files)} documents (job {job.job_id})", icon=":material/upload_file:")
                 else:
-                    # Check document size
-                    if len(doc_text) > MAX_DOC_SIZE:
-                        st.warning(f"This document is too large ({len(doc_text)} chars). Please upload a smaller document.")
-                        st.stop()
-                    else: 
-                        # Save to Qdrant
-                        point_id = save_to_qdrant(doc_text, uploaded_file.name, {
-                            "filename": uploaded_file.name,
-                            "upload_timestamp": datetime.utcnow().isoformat()
-                        })
-                        st.success("Document processed and stored in Qdrant!")
-                        
-                        # Force reload of documents list
-                        st.session_state.reload_docs = True
-                        st.rerun()
+                    st.warning("No PDF, DOCX or TXT files found in the upload.")
+
+    st.subheader('Ingestion Jobs')
+    job_panel()
+
     st.divider()
     st.subheader('Document List')
 
@@ -4,7 +4,7 @@ from datetime import datetime, timezone, timedelta
 import uuid
 from urllib.parse import quote, unquote
 
-from service.generate_quiz import generate_questions
+from service.generate_quiz import generate_questions, QUIZ_SOURCE_CHARS
 from service.qdrant_utils import list_qdrant_docs, get_document_text
 from service.track_quiz import save_quiz, uuid_to_short_id
 
@@ -40,7 +40,7 @@ st.session_state.selected_doc = selected_doc
 if st.button("Generate", use_container_width=True):
     point_id = selected_doc["point_id"]
     with st.spinner("Loading document text from Qdrant..."):
-        doc_text = get_document_text(point_id)
+        doc_text = get_document_text(point_id, max_chars=QUIZ_SOURCE_CHARS)
 
     if not doc_text:
         st.error("This document has no stored text in Qdrant.")
@@ -2,7 +2,11 @@ import time
 import streamlit as st
 from typing import List
 
-from service.qdrant_utils import list_qdrant_docs, build_vectorstore, get_document_chunks
+from service.qdrant_utils import (
+    list_qdrant_docs, search_passages, rank_document_chunks, pack_passages, embedding_cache_stats,
+    cached_answer, cache_answer, answer_cache_stats
+)
+from service.answer_stream import stream_chat
 from openai import OpenAI
 
 current_page = "ask"
@@ -37,12 +41,15 @@ k = st.slider("How many passages to retrieve", min_value=2, max_value=10, value=
 # ----------------- Retrieval helper -----------------
 def retrieve_passages_for_filename(question: str, file_name: str, k: int = 4):
     """
-    Retrieve chunks for the selected filename via vector search.
+    Start retrieving chunks for the selected filename (hybrid dense + BM25 search, then MMR diversification).
+    Twice k candidates are fetched so passages dropped when packing the context can be replaced.
+    Returns a Future of (chunk_text, payload) pairs.
     """
-    vs = build_vectorstore()
-    q_filter = {"must": [{"key": "filename", "match": {"value": file_name}}]}
+    return search_passages(question, file_name, k=2 * k)
+
+def wait_for_passages(search):
     try:
-        return vs.similarity_search(question, k=k, filter=q_filter)  
+        return search.result()
     except Exception as e:
         print(f"(Vector search failed; falling back to chunked text) Details: {e}")
         return []
@@ -58,16 +65,25 @@ def build_prompt(question: str, contexts: List[str]) -> str:
         "Answer:"
     )
 
-def answer_with_openai(prompt: str) -> str:
-    resp = client.chat.completions.create(
+def stream_answer_with_openai(prompt: str, start: float):
+    """Start the answer as a stream of text; the returned TimedStream records time to first token and total."""
+    return stream_chat(
+        client,
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "You answer questions strictly from supplied context."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.2,
+        start=start,
     )
-    return resp.choices[0].message.content.strip()
+
+def show_sources(contexts, sources):
+    with st.expander("Sources / Passages used"):
+        for i, (ctx, meta) in enumerate(zip(contexts, sources), start=1):
+            st.markdown(f"**Passage {i}** — metadata: `{meta}`")
+            st.write(ctx[:1000] + ("..." if len(ctx) > 1000 else ""))
+            st.markdown("---")
 
 # ----------------- Action -----------------
 if st.button("🔎 Ask"):
@@ -75,52 +91,56 @@ if st.button("🔎 Ask"):
         st.warning("Please enter a question.")
         st.stop()
 
-    start = time.time()
-    with st.status("Processing Question...",expanded=True) as status:
-        # Try vector-based retrieval first
-        status.write("Retrieving passages...")
-        retrieved = retrieve_passages_for_filename(query, filename, k=k)
-        
-        if retrieved:
-            
-            contexts = [d.page_content for d in retrieved if d and d.page_content]
-            sources = [d.metadata for d in retrieved]
+    start = time.perf_counter()
+    # Same document, similar question: reuse the earlier answer and its passages
+    cached = cached_answer(selected["point_id"], query)
+    if cached:
+        contexts = [text for text, _ in cached["passages"]]
+        sources = [meta for _, meta in cached["passages"]]
+    else:
+        with st.status("Processing Question...",expanded=True) as status:
+            # Try vector-based retrieval first; the search runs while the status is drawn
+            search = retrieve_passages_for_filename(query, filename, k=k)
+            status.write("Retrieving passages...")
+            retrieved = wait_for_passages(search)
+
+            if retrieved:
+                passages, tokens = pack_passages(retrieved, max_passages=k)
+            else:
+                # Fallback: rank the file's chunks lexically and keep the best that fit the budget
+                status.write("Ranking the document's chunks...")
+                ranked = rank_document_chunks(query, filename)
+                if not ranked:
+                    status.update(label="No retrievable chunks found. Re-ingest document with chunked text.", state='error', expanded=True)
+                    st.error("No retrievable chunks found. Re-ingest document with chunked text.")
+                    st.stop()
+                passages, tokens = pack_passages(ranked)
+
+            contexts = [text for text, _ in passages]
+            sources = [{key: value for key, value in payload.items() if key != "chunk_text"} for _, payload in passages]
+            status.update(label=f"Passages retrieved ({len(passages)} passages, {tokens} tokens)", state='complete', expanded=False)
+
+    # The answer streams in above the sources, which are already shown while it is written
+    answer_box = st.container()
+    show_sources(contexts, sources)
+    with answer_box:
+        st.subheader("Answer")
+        if cached:
+            st.write(cached["answer"])
+            end = time.perf_counter()
+            st.caption(f"⏱️ {end - start:.2f}s · cached answer to a similar question: “{cached['question']}”")
+            print(f"Answered from cache in {end - start:.2f}s. Answer cache: {answer_cache_stats()}")
         else:
-            # Fallback: retrieve all chunks for filename
-            status.write("Retrieving from all chunks...")
-            chunks = get_document_chunks(filename)
-            if not chunks:
-                status.update(label="No retrievable chunks found. Re-ingest document with chunked text.", state='error', expanded=True)
-                st.error("No retrievable chunks found. Re-ingest document with chunked text.")
+            try:
+                stream = stream_answer_with_openai(build_prompt(query, contexts), start)
+                st.write_stream(stream)
+            except Exception as e:
+                st.error(f"OpenAI error: {e}")
                 st.stop()
-            # Wrap each chunk with metadata
-            contexts = []
-            sources = []
-            for idx, chunk_text in enumerate(chunks):
-                contexts.append(chunk_text)
-                sources.append({"filename": filename, "chunk_index": idx})
-
-        # Build prompt and call OpenAI
-        status.write("Calling OpenAI...")
-        prompt = build_prompt(query, contexts)
-        try:
-            answer = answer_with_openai(prompt)
-        except Exception as e:
-            status.update(label="OpenAI error.", state='error', expanded=True)
-            st.error(f"OpenAI error: {e}")
-            st.stop()
-        status.update(label="Answer Generated!", state='complete', expanded=False)
-    end = time.time()
-
-    st.subheader("Answer")
-    st.write(answer)
-    st.caption(f"⏱️ {end - start:.2f}s")
-
-    # Display sources / passages
-    with st.expander("Sources / Passages used"):
-        for i, (ctx, meta) in enumerate(zip(contexts, sources), start=1):
-            st.markdown(f"**Passage {i}** — metadata: `{meta}`")
-            st.write(ctx[:1000] + ("..." if len(ctx) > 1000 else ""))
-            st.markdown("---")
-
-
+            end = time.perf_counter()
+            first_token = stream.first_token if stream.first_token is not None else end - start
+            st.caption(f"⏱️ first words after {first_token:.2f}s · complete after {end - start:.2f}s")
+            print(f"Answered in {end - start:.2f}s (first token {first_token:.2f}s). "
+                  f"Embedding cache: {embedding_cache_stats()}. Answer cache: {answer_cache_stats()}")
+            if stream.text.strip():
+                cache_answer(selected["point_id"], query, stream.text.strip(), list(zip(contexts, sources)), end - start)
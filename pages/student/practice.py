@@ -3,7 +3,7 @@ import time
 import io
 from datetime import datetime
 
-from service.generate_quiz import generate_questions
+from service.generate_quiz import generate_questions, QUIZ_SOURCE_CHARS
 from service.validation import validate_mcq_or_tf, validate_short_answer
 from service.qdrant_utils import list_qdrant_docs, get_document_text
 
@@ -59,7 +59,7 @@ st.session_state.selected_doc = selected_doc
 if st.button("Generate Questions",  use_container_width=True):
     point_id = selected_doc["point_id"]
     with st.spinner("Loading document text from Qdrant..."):
-        doc_text = get_document_text(point_id)
+        doc_text = get_document_text(point_id, max_chars=QUIZ_SOURCE_CHARS)
 
     if not doc_text:
         st.error("This document has no stored text in Qdrant.")
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# Acronyms, codes and numbers: a question about "MTX2" or "1987" must not get the answer to
+# an otherwise identical question about "PQR4" or "1990", however close the embeddings are
+_KEY_TERM = re.compile(r"\b(?=\w*[0-9])\w+(?:[.\-/]\w+)*|\b[A-Z]{2,}\w*")
+
+
+def key_terms(question):
+    return " ".join(sorted({term.lower() for term in _KEY_TERM.findall(question)}))
+
+
+class AnswerCache:
+    """
+    Persistent cache of Learn-page answers, looked up by question similarity.
+
+    An entry holds a document's answer to one question: the question's embedding, the
+    answer and the passages it was built from, plus the document's content hash when it was
+    answered. A new question about the same document and content hash whose embedding (same
+    model) is within `threshold` cosine similarity and which names the same acronyms and
+    numbers reuses the entry. Entries expire after ttl_seconds; beyond max_entries the
+    least recently used are evicted.
+    """
+
+    def __init__(self, path, threshold=0.95, ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    id INTEGER PRIMARY KEY,
+                    document_id TEXT NOT NULL,
+                    content_hash TEXT,
+                    model TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    key_terms TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    answer TEXT NOT NULL,
+                    passages TEXT NOT NULL,
+                    seconds REAL NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_document ON answers (document_id, model)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers (last_used)")
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def lookup(self, document_id, content_hash, model, question, vector):
+        """
+        The closest cached answer for question, or None.
+
+        Returns a dict with question (the cached one), answer, passages (list of
+        [text, metadata]), similarity and seconds (what producing it originally took).
+        """
+        start = time.perf_counter()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, question, vector, answer, passages, seconds FROM answers "
+                "WHERE document_id = ? AND model = ? AND content_hash IS ? AND key_terms = ? AND created >= ?",
+                (str(document_id), model, content_hash, key_terms(question), time.time() - self.ttl_seconds)
+            ).fetchall()
+            best = None
+            if rows:
+                matrix = np.stack([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+                query = np.asarray(vector, dtype=np.float32)
+                similarities = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+                i = int(np.argmax(similarities))
+                if similarities[i] >= self.threshold:
+                    best = rows[i], float(similarities[i])
+            if best is None:
+                self.misses += 1
+                return None
+            (row_id, cached_question, _, answer, passages, seconds), similarity = best
+            with self._conn:
+                self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (time.time(), row_id))
+            self.hits += 1
+            self.seconds_saved += max(0.0, seconds - (time.perf_counter() - start))
+        return {
+            "question": cached_question,
+            "answer": answer,
+            "passages": json.loads(passages),
+            "similarity": similarity,
+            "seconds": seconds,
+        }
+
+    def put(self, document_id, content_hash, model, question, vector, answer, passages, seconds):
+        """Store an answer; passages is a list of (text, metadata) pairs."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO answers (document_id, content_hash, model, question, key_terms, vector, answer, passages, "
+                "seconds, created, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(document_id), content_hash, model, question, key_terms(question),
+                 np.asarray(vector, dtype=np.float32).tobytes(), answer, json.dumps(passages, default=str),
+                 seconds, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl_seconds,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM answers WHERE id IN (SELECT id FROM answers ORDER BY last_used LIMIT ?)", (excess,)
+            )
+
+    def invalidate(self, document_ids):
+        """Drop every answer about the given documents; returns how many were dropped."""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "DELETE FROM answers WHERE document_id = ?", [(str(i),) for i in document_ids]
+            )
+        return cursor.rowcount
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM answers")
+
+    def stats(self):
+        """Hit/miss counters since the process started and the time the hits saved."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                "seconds_saved": round(self.seconds_saved, 3),
+                "entries": entries,
+            }
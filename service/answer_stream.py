@@ -0,0 +1,36 @@
+import time
+
+
+class TimedStream:
+    """
+    Text deltas of a streamed chat completion, timed.
+
+    Iterating yields the content of each chunk as it arrives (what st.write_stream renders)
+    and records first_token (seconds from `start` to the first text) and total (to the last
+    chunk). text holds everything received so far.
+    """
+
+    def __init__(self, chunks, start=None):
+        self._chunks = chunks
+        self.start = start if start is not None else time.perf_counter()
+        self.first_token = None
+        self.total = None
+        self.text = ""
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if self.first_token is None:
+                self.first_token = time.perf_counter() - self.start
+            self.text += delta
+            yield delta
+        self.total = time.perf_counter() - self.start
+
+
+def stream_chat(client, messages, model, temperature=0.2, start=None):
+    """Start a streamed chat completion; returns a TimedStream over its text."""
+    start = start if start is not None else time.perf_counter()
+    chunks = client.chat.completions.create(model=model, messages=messages, temperature=temperature, stream=True)
+    return TimedStream(chunks, start)
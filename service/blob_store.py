@@ -0,0 +1,178 @@
+import os
+import uuid
+import zlib
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:  # zlib is always available as a fallback
+    zstandard = None
+
+READ_SIZE = 256 * 1024
+
+
+class _BlobWriter:
+    """Incrementally compresses text into an open file."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        if zstandard is not None:
+            self._zstd = zstandard.ZstdCompressor(level=10).stream_writer(fh, closefd=False)
+        else:
+            self._zlib = zlib.compressobj(6)
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        if zstandard is not None:
+            self._zstd.write(data)
+        else:
+            self._fh.write(self._zlib.compress(data))
+
+    def finish(self):
+        if zstandard is not None:
+            self._zstd.close()
+        else:
+            self._fh.write(self._zlib.flush())
+
+
+class PendingBlob:
+    """
+    A new version of a blob, written to a temporary file next to it.
+
+    write() streams text in; commit() replaces the stored blob with it atomically, discard()
+    throws it away. Until commit() the stored blob (if any) is untouched.
+    """
+
+    def __init__(self, store, doc_id):
+        self._store = store
+        self._doc_id = doc_id
+        self._ext = "zst" if zstandard is not None else "zz"
+        self._tmp_path = f"{store._path(doc_id, self._ext)}.{uuid.uuid4().hex}.tmp"
+        self._fh = open(self._tmp_path, "wb")
+        self._writer = _BlobWriter(self._fh)
+
+    def write(self, text):
+        self._writer.write(text)
+
+    def close(self):
+        """Finish compressing and release the file handle; the blob can still be committed."""
+        if self._fh is not None:
+            self._writer.finish()
+            self._fh.close()
+            self._fh = None
+
+    def commit(self):
+        self.close()
+        os.replace(self._tmp_path, self._store._path(self._doc_id, self._ext))  # readers never see a partial blob
+        # Drop a copy in the other format left by an earlier write
+        other = self._store._path(self._doc_id, "zz" if self._ext == "zst" else "zst")
+        if os.path.exists(other):
+            os.remove(other)
+
+    def discard(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class BlobStore:
+    """
+    Compressed on-disk store for full document texts, one file per document id.
+
+    Texts are written with zstd when the zstandard package is installed and with zlib
+    otherwise; reads understand both formats. Writing and reading both stream, so a
+    document never has to be held in memory as a whole.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, doc_id, ext):
+        return os.path.join(self.root, f"{doc_id}.{ext}")
+
+    def _existing_path(self, doc_id):
+        for ext in ("zst", "zz"):
+            path = self._path(doc_id, ext)
+            if os.path.exists(path):
+                return path, ext
+        return None, None
+
+    def begin(self, doc_id):
+        """Start a new version of the blob for doc_id; see PendingBlob."""
+        return PendingBlob(self, doc_id)
+
+    @contextmanager
+    def writer(self, doc_id):
+        """
+        Stream text into the blob for doc_id with writer.write(text).
+
+        The blob only replaces any previous version when the block exits cleanly.
+        """
+        pending = self.begin(doc_id)
+        try:
+            yield pending
+        except BaseException:
+            pending.discard()
+            raise
+        pending.commit()
+
+    def put(self, doc_id, text):
+        with self.writer(doc_id) as writer:
+            writer.write(text)
+
+    def _iter_bytes(self, path, ext):
+        with open(path, "rb") as f:
+            if ext == "zst":
+                if zstandard is None:
+                    raise RuntimeError("zstandard is required to read zstd blobs")
+                reader = zstandard.ZstdDecompressor().stream_reader(f)
+                while True:
+                    data = reader.read(READ_SIZE)
+                    if not data:
+                        return
+                    yield data
+            else:
+                decompressor = zlib.decompressobj()
+                while True:
+                    blob = f.read(READ_SIZE)
+                    if not blob:
+                        yield decompressor.flush()
+                        return
+                    yield decompressor.decompress(blob)
+
+    def get(self, doc_id, max_chars=None):
+        """
+        Return the stored text (stripped), or None if there is no blob for doc_id.
+
+        With max_chars, only the beginning of the blob is decompressed.
+        """
+        path, ext = self._existing_path(doc_id)
+        if path is None:
+            return None
+        parts, size = [], 0
+        for data in self._iter_bytes(path, ext):
+            parts.append(data)
+            size += len(data)
+            # UTF-8 needs at most 4 bytes per char; a little extra covers leading whitespace
+            if max_chars is not None and size >= 4 * max_chars + 1024:
+                break
+        text = b"".join(parts).decode("utf-8", errors="ignore").strip()
+        return text[:max_chars] if max_chars is not None else text
+
+    def ids(self):
+        """Ids of every stored blob."""
+        return {
+            name.rsplit(".", 1)[0] for name in os.listdir(self.root)
+            if name.endswith((".zst", ".zz"))
+        }
+
+    def exists(self, doc_id):
+        return self._existing_path(doc_id)[0] is not None
+
+    def delete(self, doc_id):
+        path, _ = self._existing_path(doc_id)
+        if path is not None:
+            os.remove(path)
@@ -0,0 +1,165 @@
+import re
+from dataclasses import dataclass
+
+CHUNK_TOKENS = 400          # target chunk size in tokens
+CHUNK_OVERLAP_TOKENS = 50   # tokens repeated from the end of the previous chunk
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORDS = re.compile(r"\w+|[^\w\s]")
+_NUMBERED_HEADING = re.compile(r"^(\d+(\.\d+)*\.?|[IVXLC]+\.)\s+\S")
+_NAMED_HEADING = re.compile(r"^(chapter|section|part|unit|lecture|appendix|topic)\b", re.IGNORECASE)
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken's cl100k_base when available, else approximates with words."""
+
+    def __init__(self, encoding="cl100k_base"):
+        try:
+            import tiktoken
+            self._enc = tiktoken.get_encoding(encoding)
+        except Exception:  # tiktoken missing or encoding not downloadable
+            self._enc = None
+
+    def count(self, text):
+        if self._enc is not None:
+            return len(self._enc.encode(text, disallowed_special=()))
+        return len(_WORDS.findall(text))
+
+    def split(self, text, max_tokens):
+        """Cut text that has no sentence breaks into pieces of at most max_tokens."""
+        if self._enc is not None:
+            tokens = self._enc.encode(text, disallowed_special=())
+            return [self._enc.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+        words = text.split()
+        return [" ".join(words[i:i + max_tokens]) for i in range(0, len(words), max_tokens)]
+
+
+@dataclass
+class Chunk:
+    text: str
+    page: int
+    page_end: int
+    section: str
+    token_count: int
+
+
+def is_heading(block):
+    """Heuristic: a short single line that looks like a title, numbered heading or markdown heading."""
+    if "\n" in block or len(block) > 100:
+        return False
+    if block.startswith("#"):
+        return True
+    if block.endswith((".", ",", ";", ":", "?", "!")):
+        return False
+    if len(block.split()) > 12:
+        return False
+    return bool(
+        _NUMBERED_HEADING.match(block)
+        or _NAMED_HEADING.match(block)
+        or (block.isupper() and any(c.isalpha() for c in block))
+    )
+
+
+class StructuredChunker:
+    """
+    Split text on document structure and size chunks in tokens.
+
+    Headings start a new chunk and become the section of the chunks that follow. Paragraphs
+    are packed into chunks of up to max_tokens; a paragraph that is too long is split on
+    sentences (and a sentence that is too long on tokens). Each new chunk repeats up to
+    overlap_tokens of trailing sentences/paragraphs from the previous one. Every piece of
+    text is tokenized once, so chunking is linear in the length of the document.
+    """
+
+    def __init__(self, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS, counter=None):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+        self.counter = counter or TokenCounter()
+
+    def _units(self, block):
+        """(text, tokens) pieces of a block, each no larger than max_tokens."""
+        tokens = self.counter.count(block)
+        if tokens <= self.max_tokens:
+            yield block, tokens
+            return
+        for sentence in _SENTENCE_END.split(block):
+            sentence_tokens = self.counter.count(sentence)
+            if sentence_tokens <= self.max_tokens:
+                yield sentence, sentence_tokens
+            else:
+                for piece in self.counter.split(sentence, self.max_tokens):
+                    yield piece, self.counter.count(piece)
+
+    @staticmethod
+    def _join(units):
+        # Units that continue a paragraph are joined with a space, new paragraphs with a blank line
+        parts = []
+        for text, _, _, starts_paragraph in units:
+            if parts:
+                parts.append("\n\n" if starts_paragraph else " ")
+            parts.append(text)
+        return "".join(parts)
+
+    def chunk(self, pages):
+        """
+        Yield Chunks from text or from a stream of (page_number, text) pairs.
+
+        Pages are consumed lazily, so chunks are produced while extraction is still running.
+        """
+        if isinstance(pages, str):
+            pages = [(1, pages)]
+
+        section = ""
+        units = []   # (text, tokens, page, starts_paragraph) in the chunk being built
+        size = 0
+
+        def emit(keep_overlap):
+            nonlocal units, size
+            chunk = Chunk(
+                text=self._join(units),
+                page=units[0][2],
+                page_end=units[-1][2],
+                section=section,
+                token_count=size
+            )
+            carried, carried_size = [], 0
+            if keep_overlap:
+                for position, unit in enumerate(reversed(units)):
+                    if carried_size + unit[1] <= self.overlap_tokens:
+                        if position == len(units) - 1:
+                            break  # never carry the whole chunk over
+                        carried.insert(0, unit)
+                        carried_size += unit[1]
+                        continue
+                    # Carry the trailing sentences of the unit that does not fit whole
+                    for sentence in reversed(_SENTENCE_END.split(unit[0])):
+                        sentence_tokens = self.counter.count(sentence)
+                        if carried_size + sentence_tokens > self.overlap_tokens:
+                            break
+                        carried.insert(0, (sentence, sentence_tokens, unit[2], False))
+                        carried_size += sentence_tokens
+                    break
+            units, size = carried, carried_size
+            return chunk
+
+        for page_number, page_text in pages:
+            for block in _PARAGRAPH_BREAK.split(page_text):
+                block = block.strip()
+                if not block:
+                    continue
+                if is_heading(block):
+                    if units:
+                        yield emit(keep_overlap=False)
+                    section = block.lstrip("#").strip()
+                for position, (text, tokens) in enumerate(self._units(block)):
+                    if units and size + tokens > self.max_tokens:
+                        yield emit(keep_overlap=True)
+                        # Drop overlap that would not leave room for the new unit
+                        while units and size + tokens > self.max_tokens:
+                            size -= units.pop(0)[1]
+                    units.append((text, tokens, page_number, position == 0))
+                    size += tokens
+
+        if units:
+            yield emit(keep_overlap=False)
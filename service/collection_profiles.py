@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+
+from qdrant_client.http import models
+
+
+@dataclass
+class CollectionProfile:
+    """
+    Storage and index settings for the documents collection.
+
+    quantization: None, "int8" (scalar, 4x smaller) or "binary" (32x smaller); quantized
+        vectors stay in RAM and searches rescore the best candidates with the originals
+    oversampling: candidates fetched per requested result before rescoring
+    on_disk: keep the original float32 vectors on disk (memory-mapped) instead of in RAM
+    hnsw_m / hnsw_ef_construct: HNSW graph degree and build-time beam width
+    hnsw_ef: search-time beam width (None uses Qdrant's default)
+    """
+    quantization: str = None
+    oversampling: float = 1.0
+    on_disk: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    hnsw_ef: int = None
+
+    def vector_params(self, size, distance=models.Distance.COSINE):
+        return models.VectorParams(size=size, distance=distance, on_disk=self.on_disk)
+
+    def hnsw_config(self):
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        if self.quantization == "int8":
+            return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            ))
+        if self.quantization == "binary":
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def search_params(self):
+        """Search parameters matching the profile (rescoring for quantized collections)."""
+        quantization = None
+        if self.quantization:
+            quantization = models.QuantizationSearchParams(rescore=True, oversampling=self.oversampling)
+        if quantization is None and self.hnsw_ef is None:
+            return None
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def estimated_ram_bytes(self, points, dim):
+        """Rough resident size of vectors and HNSW graph, for comparing profiles."""
+        ram = 0 if self.on_disk else points * dim * 4
+        if self.quantization == "int8":
+            ram += points * dim
+        elif self.quantization == "binary":
+            ram += points * dim // 8
+        return ram + points * self.hnsw_m * 2 * 4
+
+
+PROFILES = {
+    # float32 vectors in RAM, the original setup
+    "default": CollectionProfile(),
+    # int8 copies in RAM for search, float32 originals on disk for rescoring
+    "int8": CollectionProfile(quantization="int8", oversampling=2.0, on_disk=True),
+    # 1-bit copies in RAM; works well for 1536-dim OpenAI embeddings with enough oversampling
+    "binary": CollectionProfile(quantization="binary", oversampling=3.0, on_disk=True),
+    # everything on disk and a sparser graph, for small servers
+    "low_memory": CollectionProfile(quantization="int8", oversampling=2.0, on_disk=True, hnsw_m=8, hnsw_ef_construct=64),
+    # denser graph and wider search beam when recall matters more than memory
+    "high_recall": CollectionProfile(hnsw_m=32, hnsw_ef_construct=256, hnsw_ef=128),
+}
+
+
+def get_profile(name):
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown collection profile '{name}'. Choose one of: {', '.join(PROFILES)}")
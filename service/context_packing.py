@@ -0,0 +1,132 @@
+import math
+import threading
+from collections import Counter, OrderedDict
+
+from service.chunking import TokenCounter
+from service.sparse_vectors import terms, BM25_K1, BM25_B
+
+_counter = None
+
+
+def _token_counter():
+    global _counter
+    if _counter is None:
+        _counter = TokenCounter()
+    return _counter
+
+
+def shingles(text):
+    """Pairs of consecutive terms: shared by repeated text, rarely by chunks that only share a topic."""
+    words = terms(text)
+    return set(zip(words, words[1:])) or set(words)
+
+
+def passage_tokens(text, payload):
+    """Tokens of a passage: the token_count stored at ingestion, else counted."""
+    if (payload or {}).get("token_count"):
+        return payload["token_count"]
+    return _token_counter().count(text)
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 index over the chunks stored under one filename.
+
+    Built once from (chunk_text, payload) pairs in chunk order, with the same terms as the
+    sparse vectors in Qdrant but its own IDF, so it ranks chunks without embedding the
+    question or calling Qdrant.
+    """
+
+    def __init__(self, passages):
+        self.passages = list(passages)
+        self._postings = {}   # term -> [(position, term frequency)]
+        self._lengths = []
+        for position, (text, _) in enumerate(self.passages):
+            counts = Counter(terms(text))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((position, tf))
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 1.0
+        n = len(self.passages)
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def __len__(self):
+        return len(self.passages)
+
+    def scores(self, question):
+        """BM25 score of every chunk sharing a term with question, by position."""
+        scores = {}
+        for term in set(terms(question)):
+            for position, tf in self._postings.get(term, ()):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[position] / (self._avg_length or 1.0))
+                scores[position] = scores.get(position, 0.0) + self._idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def rank(self, question):
+        """Every chunk, best first: those matching question by score, then the rest in document order."""
+        scores = self.scores(question)
+        order = sorted(range(len(self.passages)), key=lambda position: (-scores.get(position, 0.0), position))
+        return [self.passages[position] for position in order]
+
+
+class LexicalIndexCache:
+    """Lexical indexes built on first use, keeping the max_entries most recently used."""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        """The index for key, built from load() (returning (chunk_text, payload) pairs) if it is not cached."""
+        with self._lock:
+            if key in self._indexes:
+                self._indexes.move_to_end(key)
+                return self._indexes[key]
+        index = LexicalIndex(load())
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+def pack_context(passages, budget_tokens, max_passages=None, redundancy=0.7):
+    """
+    The best passages that fit in budget_tokens, best first.
+
+    passages are (chunk_text, payload) pairs ranked best first. A passage is skipped when it
+    no longer fits the remaining budget (a smaller one further down may still fit) or when
+    at least `redundancy` of its shingles are already in one packed passage, as with text
+    repeated across documents or near-identical chunks. If even
+    the best passage is over budget, it is cut to fit so the context is never empty.
+
+    Returns:
+        tuple: (list of packed (chunk_text, payload) pairs, their total tokens)
+    """
+    packed, packed_shingles, used = [], [], 0
+    for text, payload in passages:
+        if max_passages is not None and len(packed) >= max_passages:
+            break
+        tokens = passage_tokens(text, payload)
+        if used + tokens > budget_tokens:
+            continue
+        own = shingles(text)
+        if own and any(len(own & seen) >= redundancy * len(own) for seen in packed_shingles):
+            continue
+        packed.append((text, payload))
+        packed_shingles.append(own)
+        used += tokens
+    if not packed and passages and budget_tokens > 0:
+        text, payload = passages[0]
+        text = _token_counter().split(text, budget_tokens)[0]
+        used = _token_counter().count(text)
+        packed = [(text, {**(payload or {}), "token_count": used})]
+    return packed, used
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import threading
+
+COLUMNS = ["id", "filename", "upload_timestamp", "updated_timestamp", "chunk_count", "char_count", "content_hash", "status"]
+
+
+class DocumentCatalog:
+    """
+    Local SQLite catalog of stored documents, one row per document id.
+
+    Rows hold the metadata the pages list documents by (filename, upload time, chunk and
+    character counts, content hash) and the ingest status: 'ingesting' while a document's
+    chunks are being written, 'ready' once they are all in Qdrant. Listing reads only this
+    table, so it needs no round trip to the vector database.
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    upload_timestamp TEXT,
+                    updated_timestamp TEXT,
+                    chunk_count INTEGER,
+                    char_count INTEGER,
+                    content_hash TEXT,
+                    status TEXT NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_status ON documents (status, upload_timestamp)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def add(self, document_id, filename, upload_timestamp=None, status="ingesting", **fields):
+        """Insert or replace the row for document_id."""
+        row = {"id": str(document_id), "filename": filename, "upload_timestamp": upload_timestamp, "status": status, **fields}
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO documents ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values())
+            )
+
+    def update(self, document_id, **fields):
+        """Set the given columns on an existing row; returns False if there is no such row."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE documents SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?",
+                [*fields.values(), str(document_id)]
+            )
+        return cursor.rowcount > 0
+
+    def remove(self, document_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM documents WHERE id = ?", [(str(i),) for i in document_ids])
+
+    def get(self, document_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE id = ?", (str(document_id),)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, status="ready"):
+        """Rows with the given status (all rows for None), oldest upload first."""
+        query = "SELECT * FROM documents"
+        params = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY upload_timestamp, id", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def is_synced(self):
+        """Whether the catalog has been filled from the collection at least once."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'synced'").fetchone()
+        return row is not None
+
+    def replace_all(self, rows):
+        """Replace every row with rows (dicts keyed by COLUMNS) in one transaction and mark the catalog synced."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.executemany(
+                f"INSERT INTO documents ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [[row.get(column) for column in COLUMNS] for row in rows]
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced', '1')")
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from langchain_core.embeddings import Embeddings
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model, sha256 of chunk text).
+
+    Vectors are stored as float32 blobs in SQLite. When the stored vectors exceed
+    max_bytes, the least recently used entries are evicted. Their total size is counted
+    once when the cache is opened and kept up to date on every write, so writes never scan
+    the table.
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, hash)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model, texts):
+        """Return a list aligned with texts holding the cached vector or None."""
+        hashes = [text_hash(t) for t in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model, *part]
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                        [(now, model, h) for h in found]
+                    )
+        return [array("f", found[h]).tolist() if h in found else None for h in hashes]
+
+    def put_many(self, model, texts, vectors):
+        now = time.time()
+        rows = {(model, text_hash(t)): array("f", v).tobytes() for t, v in zip(texts, vectors)}
+        hashes = [h for _, h in rows]
+        with self._lock, self._conn:
+            # Rows being replaced no longer count
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                self._total_bytes -= self._conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model, *part]
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                [(m, h, vector, now) for (m, h), vector in rows.items()]
+            )
+            self._total_bytes += sum(len(vector) for vector in rows.values())
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least recently used rows until we are back under 90% of the limit
+        to_free = self._total_bytes - int(self.max_bytes * 0.9)
+        freed = 0
+        stale = []
+        for model, h, size in self._conn.execute(
+            "SELECT model, hash, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        ):
+            stale.append((model, h))
+            freed += size
+            if freed >= to_free:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE model = ? AND hash = ?", stale)
+        self._total_bytes -= freed
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM embeddings")
+            self._total_bytes = 0
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrap a LangChain embeddings object so every call checks an EmbeddingCache first.
+
+    Query vectors are cached under their own model key: some models embed a query
+    differently from a document of the same text (e.g. FastEmbed adds a query prefix).
+    """
+
+    def __init__(self, embeddings, cache, model=None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model or getattr(embeddings, "model", type(embeddings).__name__)
+        self.query_model = f"{self.model}:query"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self.api_seconds = 0.0
+
+    def _record(self, hits, misses, seconds):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            if misses:
+                self.api_calls += 1
+                self.api_seconds += seconds
+
+    def embed_documents(self, texts):
+        vectors = self.cache.get_many(self.model, texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        seconds = 0.0
+        if missing:
+            start = time.perf_counter()
+            fresh = self.embeddings.embed_documents([texts[i] for i in missing])
+            seconds = time.perf_counter() - start
+            self.cache.put_many(self.model, [texts[i] for i in missing], fresh)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        self._record(len(texts) - len(missing), len(missing), seconds)
+        return vectors
+
+    def embed_query(self, text):
+        cached = self.cache.get_many(self.query_model, [text])[0]
+        if cached is not None:
+            self._record(1, 0, 0.0)
+            return cached
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self._record(0, 1, time.perf_counter() - start)
+        self.cache.put_many(self.query_model, [text], [vector])
+        return vector
+
+    def stats(self):
+        """Hit/miss counters plus an estimate of the API time the hits saved."""
+        with self._lock:
+            per_text = self.api_seconds / self.misses if self.misses else 0.0
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                "api_calls": self.api_calls,
+                "api_seconds": round(self.api_seconds, 3),
+                "seconds_saved": round(self.hits * per_text, 3),
+            }
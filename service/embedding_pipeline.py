@@ -0,0 +1,111 @@
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from qdrant_client.http import models
+
+EMBED_BATCH_SIZE = 64   # chunks per embedding request
+EMBED_MAX_WORKERS = 4   # embedding requests in flight at once
+
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items from any iterable."""
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _embed_batch(embeddings, batch):
+    vectors = embeddings.embed_documents([p["text"] for p in batch])
+    return [
+        models.PointStruct(
+            id=p["id"],
+            vector={"": vector, **p["sparse_vectors"]} if p.get("sparse_vectors") else vector,
+            payload=p["payload"]
+        )
+        for p, vector in zip(batch, vectors)
+    ]
+
+
+def embed_and_upsert(pending, embeddings, upsert, batch_size=EMBED_BATCH_SIZE, max_workers=EMBED_MAX_WORKERS,
+                     on_progress=None):
+    """
+    Embed points in batches on a bounded worker pool and upsert each batch as soon as it is ready.
+
+    Args:
+        pending: iterable of dicts with "id", "text" and "payload", and optionally
+            "sparse_vectors" ({name: SparseVector}) stored next to the dense vector
+        embeddings: object exposing embed_documents(list[str])
+        upsert: callable receiving a list of PointStruct; it either upserts before returning
+            or returns a Future, in which case up to max_workers upserts run concurrently
+        batch_size: chunks sent per embedding request
+        max_workers: max embedding requests (and asynchronous upserts) in flight
+        on_progress: optional callable(embedded, upserted) with running totals
+
+    Returns:
+        int: number of points upserted
+    """
+    embedded = 0
+    upserted = 0
+    in_flight = {}  # future -> "embed" | "upsert"
+
+    def count(kind):
+        return sum(1 for k in in_flight.values() if k == kind)
+
+    def drain(timeout=None):
+        """Handle finished work; waits for at least one future unless timeout is given."""
+        nonlocal embedded, upserted
+        done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            kind = in_flight.pop(future)
+            points = future.result()
+            if kind == "embed":
+                embedded += len(points)
+                if on_progress:
+                    on_progress(embedded, upserted)
+                pending_upsert = upsert(points)
+                if isinstance(pending_upsert, Future):
+                    in_flight[_counted(pending_upsert, points)] = "upsert"
+                    continue
+            upserted += len(points)
+            if on_progress:
+                on_progress(embedded, upserted)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            for batch in batched(pending, batch_size):
+                # Upsert whatever finished while the producer was busy, without waiting
+                if in_flight:
+                    drain(timeout=0)
+                while count("embed") >= max_workers or count("upsert") >= max_workers:
+                    drain()
+                in_flight[pool.submit(_embed_batch, embeddings, batch)] = "embed"
+            while in_flight:
+                drain()
+        except Exception:
+            for future, kind in in_flight.items():
+                if kind == "embed":
+                    future.cancel()
+            # Let upserts already sent finish, so a rollback after this sees every point
+            wait([future for future, kind in in_flight.items() if kind == "upsert"])
+            raise
+
+    return upserted
+
+
+def _counted(upsert_future, points):
+    """Future resolving to points once upsert_future is done (re-raising its error)."""
+    result = Future()
+
+    def done(f):
+        try:
+            f.result()
+        except BaseException as e:
+            result.set_exception(e)
+        else:
+            result.set_result(points)
+
+    upsert_future.add_done_callback(done)
+    return result
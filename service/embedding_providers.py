@@ -0,0 +1,186 @@
+import hashlib
+import math
+import re
+import time
+from dataclasses import dataclass
+
+from langchain_core.embeddings import Embeddings
+
+_WORD = re.compile(r"\w+")
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic offline embeddings for development, tests and benchmarks.
+
+    Words and word pairs are feature-hashed (signed) into dim buckets and the result is
+    L2-normalized, so texts sharing vocabulary score high cosine similarity and the same
+    text always gets the same vector, on any machine. latency adds a sleep per call to
+    stand in for an embedding API.
+    """
+
+    def __init__(self, dim=1536, latency=0.0):
+        self.dim = dim
+        self.latency = latency
+        self.model = f"hash-{dim}"
+
+    def _vector(self, text):
+        words = _WORD.findall(text.lower())
+        features = [(w, 1.0) for w in words] + [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+        vector = [0.0] * self.dim
+        for feature, weight in features or [("", 1.0)]:
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+            vector[h % self.dim] += weight if h >> 63 else -weight
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class FastEmbedEmbeddings(Embeddings):
+    """
+    Local CPU embeddings with a fastembed (ONNX Runtime) model: no API round trip per chunk
+    or question. The model is downloaded to cache_dir on first use.
+
+    Queries go through the model's query_embed, which adds the query prefix retrieval
+    models such as BGE expect.
+    """
+
+    def __init__(self, model, cache_dir=None, threads=None, batch_size=64):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError:
+            raise ImportError("EMBEDDING_PROVIDER 'fastembed' needs the fastembed package: pip install fastembed")
+        self.model = model
+        self.batch_size = batch_size
+        self._model = TextEmbedding(model_name=model, cache_dir=cache_dir, threads=threads)
+
+    def embed_documents(self, texts):
+        return [vector.tolist() for vector in self._model.embed(texts, batch_size=self.batch_size)]
+
+    def embed_query(self, text):
+        return next(iter(self._model.query_embed(text))).tolist()
+
+
+def truncate(vector, dim):
+    """First dim components of vector, L2-normalized again."""
+    head = vector[:dim]
+    norm = math.sqrt(sum(x * x for x in head)) or 1.0
+    return [x / norm for x in head]
+
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    Reduced-size vectors from another embeddings object: the first dim components,
+    renormalized. Models trained Matryoshka-style (MATRYOSHKA_MODELS) keep most of their
+    retrieval quality this way at a fraction of the memory and search cost.
+
+    The model name gets an "@dim" suffix so cached vectors of different sizes never mix.
+    """
+
+    def __init__(self, embeddings, dim):
+        self.embeddings = embeddings
+        self.dim = dim
+        self.model = f"{getattr(embeddings, 'model', type(embeddings).__name__)}@{dim}"
+
+    def embed_documents(self, texts):
+        return [truncate(v, self.dim) for v in self.embeddings.embed_documents(texts)]
+
+    def embed_query(self, text):
+        return truncate(self.embeddings.embed_query(text), self.dim)
+
+
+@dataclass
+class EmbeddingProvider:
+    """
+    An embedding backend and its default model.
+
+    dim: vector size of the default model; the collection is created with it, so changing
+        provider or model needs tools.reembed_collection
+    """
+    model: str
+    dim: int
+
+
+PROVIDERS = {
+    # OpenAI API, the original setup
+    "openai": EmbeddingProvider("text-embedding-ada-002", 1536),
+    # small ONNX model on the CPU; 384 dims also make the collection 4x smaller
+    "fastembed": EmbeddingProvider("BAAI/bge-small-en-v1.5", 384),
+    # deterministic feature hashing for offline development, tests and benchmarks
+    "hash": EmbeddingProvider("hash", 1536),
+}
+
+
+# Full vector size of known models
+MODEL_DIMS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "BAAI/bge-small-en-v1.5": 384,
+    "BAAI/bge-base-en-v1.5": 768,
+    "nomic-ai/nomic-embed-text-v1.5": 768,
+    "mixedbread-ai/mxbai-embed-large-v1": 1024,
+}
+
+# Trained so that a prefix of the vector is itself a good embedding; OpenAI's text-embedding-3
+# models return the shortened vector directly (the dimensions parameter)
+MATRYOSHKA_MODELS = {
+    "text-embedding-3-small",
+    "text-embedding-3-large",
+    "nomic-ai/nomic-embed-text-v1.5",
+    "mixedbread-ai/mxbai-embed-large-v1",
+}
+
+
+def get_provider(name):
+    try:
+        return PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown embedding provider '{name}'. Choose one of: {', '.join(PROVIDERS)}")
+
+
+def default_dim(provider_name, model=None):
+    """Full vector size of model (the provider's default model if None)."""
+    provider = get_provider(provider_name)
+    return MODEL_DIMS.get(model or provider.model, provider.dim)
+
+
+def create_embeddings(provider_name, model=None, dim=None, api_key=None, cache_dir=None):
+    """
+    LangChain Embeddings for a provider; model and dim default to the provider's. api_key is
+    used by openai, cache_dir (where models are downloaded) by fastembed.
+
+    A dim below the model's full size gives truncated vectors: text-embedding-3 models are
+    asked for dim dimensions, local models are truncated after embedding.
+    """
+    provider = get_provider(provider_name)
+    model = model or provider.model
+    if provider_name == "hash":
+        return HashEmbeddings(dim or provider.dim)
+
+    full = MODEL_DIMS.get(model)
+    reduced = dim is not None and full is not None and dim != full
+    if reduced and dim > full:
+        raise ValueError(f"'{model}' makes {full}-dim vectors; EMBEDDING_DIM {dim} is larger.")
+
+    if provider_name == "openai":
+        from langchain_openai import OpenAIEmbeddings  # slow import, only paid by processes that embed
+        if not reduced:
+            return OpenAIEmbeddings(model=model, api_key=api_key)
+        if model not in MATRYOSHKA_MODELS:
+            raise ValueError(f"'{model}' cannot return {dim}-dim vectors; use text-embedding-3-small or -large.")
+        return TruncatedEmbeddings(OpenAIEmbeddings(model=model, api_key=api_key, dimensions=dim), dim)
+
+    embeddings = FastEmbedEmbeddings(model, cache_dir=cache_dir)
+    if not reduced:
+        return embeddings
+    if model not in MATRYOSHKA_MODELS:
+        print(f"'{model}' is not trained for truncated vectors; check quality with benchmarks.bench_dimensions")
+    return TruncatedEmbeddings(embeddings, dim)
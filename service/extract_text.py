@@ -1,39 +1,191 @@
 import io
+import os
+import tempfile
+import threading
+import zipfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pdfplumber
 import fitz  # PyMuPDF
 from docx import Document as DocxDocument
 
-def extract_text(file_data, file_type: str) -> str:
-    """
-    Extract text from PDF, DOCX, or TXT files.
 
-    Args:
-        file_data: Uploaded file object or file path
-        file_type: 'pdf', 'docx', 'txt'
+class DocumentTooLargeError(ValueError):
+    """Raised when a streamed document grows past the allowed size."""
 
-    Returns:
-        str: Extracted text
+
+def iter_pdf_pages(file_data):
     """
-    text = ""
+    Yield (page_number, text) for each page of a PDF, one page at a time.
 
-    if file_type == "pdf":
+    PyMuPDF is tried first; if it fails, pdfplumber takes over from the page that failed.
+    """
+    next_page = 0
+    try:
+        # First try PyMuPDF (fitz) for robust extraction
+        pdf_doc = fitz.open(stream=file_data.read(), filetype="pdf")
         try:
-            # First try PyMuPDF (fitz) for robust extraction
-            pdf_doc = fitz.open(stream=file_data.read(), filetype="pdf")
             for page in pdf_doc:
-                text += page.get_text()
+                text = page.get_text()
+                next_page += 1
+                yield next_page, text
+        finally:
             pdf_doc.close()
-        except Exception as e1:
-            # fallback to pdfplumber if fitz fails
+        return
+    except Exception as e1:
+        fitz_error = e1
+
+    # fallback to pdfplumber if fitz fails
+    try:
+        file_data.seek(0)  # reset pointer
+        with pdfplumber.open(file_data) as pdf:
+            for page_number, page in enumerate(pdf.pages[next_page:], start=next_page + 1):
+                page_text = page.extract_text()
+                yield page_number, page_text or ""
+    except Exception as e2:
+        raise ValueError(f"Failed to read PDF. fitz error: {fitz_error}, pdfplumber error: {e2}")
+
+
+def usable_cpus():
+    """CPUs this process may run on (its affinity or cgroup-limited set where the OS reports one)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        return os.cpu_count() or 1
+
+
+PDF_EXTRACT_WORKERS = min(4, usable_cpus())
+# A warm pool adds ~20 ms plus ~0.2 ms per page (temp file, IPC, opening the PDF in each
+# worker) to PyMuPDF's ~1.6 ms per page; with two free cores that breaks even near 40 pages.
+# Below PARALLEL_MIN_PAGES, with margin, a PDF is extracted in-process; with one usable CPU
+# PDF_EXTRACT_WORKERS is 1 and it always is. See benchmarks.bench_pdf_extraction
+PARALLEL_MIN_PAGES = 100
+
+# Worker pools are spawned once per process and shared by every upload: spawning workers and
+# importing fitz, pdfplumber and docx in each costs more than extracting a few hundred pages
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def extraction_pool(workers):
+    """The process pool with `workers` processes, started on first use (again if it broke)."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None or getattr(pool, "_broken", False):
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+        return pool
+
+
+# The PDF a worker process has open, as (path, document)
+_worker_pdf = (None, None)
+
+
+def _extract_page_range(path, start, stop):
+    """Worker: extract pages [start, stop) of the PDF at path. A None text marks a page PyMuPDF could not read."""
+    global _worker_pdf
+    if _worker_pdf[0] != path:
+        if _worker_pdf[1] is not None:
+            _worker_pdf[1].close()
+        _worker_pdf = (path, fitz.open(path))
+    results = []
+    for index in range(start, stop):
+        try:
+            results.append((index, _worker_pdf[1][index].get_text()))
+        except Exception:
+            results.append((index, None))
+    return results
+
+
+def iter_pdf_pages_parallel(file_data, workers=PDF_EXTRACT_WORKERS, min_pages=PARALLEL_MIN_PAGES):
+    """
+    Yield (page_number, text) for each page of a PDF, extracted on a process pool.
+
+    The PDF is written to a temporary file and its page range split into slices that the
+    shared worker processes (see extraction_pool) extract with PyMuPDF. Results are yielded
+    in page order as soon as they are available; pages that fail in PyMuPDF are re-read
+    individually with pdfplumber. Small PDFs, or workers <= 1, use the single-process
+    iter_pdf_pages.
+    """
+    pdf_bytes = file_data.read()
+    try:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_doc:
+            page_count = pdf_doc.page_count
+    except Exception:
+        page_count = 0
+
+    if workers <= 1 or page_count < max(min_pages, 2):
+        yield from iter_pdf_pages(io.BytesIO(pdf_bytes))
+        return
+
+    slice_size = max(1, min(25, -(-page_count // (workers * 4))))  # several small slices per worker
+    plumber = None
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf_bytes)
+        path = f.name
+    futures = deque()
+    try:
+        pool = extraction_pool(workers)
+        # Only a bounded window of slices is in flight, so extracted text that the consumer
+        # has not reached yet never piles up for very long documents
+        starts = iter(range(0, page_count, slice_size))
+
+        def fill():
+            while len(futures) < workers * 2:
+                start = next(starts, None)
+                if start is None:
+                    return
+                futures.append((start, pool.submit(_extract_page_range, path, start, min(start + slice_size, page_count))))
+
+        fill()
+        while futures:
+            start, future = futures.popleft()
             try:
-                file_data.seek(0)  # reset pointer
-                with pdfplumber.open(file_data) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text
-            except Exception as e2:
-                raise ValueError(f"Failed to read PDF. fitz error: {e1}, pdfplumber error: {e2}")
+                results = future.result()
+            except Exception:
+                results = [(index, None) for index in range(start, min(start + slice_size, page_count))]
+            for index, text in results:
+                if text is None:
+                    # fallback to pdfplumber for just this page
+                    try:
+                        if plumber is None:
+                            plumber = pdfplumber.open(io.BytesIO(pdf_bytes))
+                        text = plumber.pages[index].extract_text() or ""
+                    except Exception as e:
+                        raise ValueError(f"Failed to read page {index + 1} of PDF: {e}")
+                yield index + 1, text
+            fill()
+    finally:
+        # Stop outstanding work if the consumer gave up early; slices already running finish
+        # on their own, after which the file can go (workers keep their handle open until
+        # the next PDF, which POSIX allows)
+        for _, future in futures:
+            future.cancel()
+        if plumber is not None:
+            plumber.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def iter_text(file_data, file_type: str, workers: int = 1):
+    """
+    Stream text from PDF, DOCX, or TXT files as (page_number, text) pairs.
+
+    PDFs are yielded page by page; DOCX and TXT files are yielded as a single page.
+
+    Args:
+        file_data: Uploaded file object or file path
+        file_type: 'pdf', 'docx', 'txt'
+        workers: processes used to extract large PDFs (1 = extract in this process)
+    """
+    if file_type == "pdf":
+        if workers > 1:
+            yield from iter_pdf_pages_parallel(file_data, workers=workers)
+        else:
+            yield from iter_pdf_pages(file_data)
 
     elif file_type == "docx":
         try:
@@ -41,10 +193,10 @@ def extract_text(file_data, file_type: str) -> str:
                 doc = DocxDocument(file_data)
             else:
                 doc = DocxDocument(file_data.name)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
+            text = "".join(para.text + "\n" for para in doc.paragraphs)
         except Exception as e:
             raise ValueError(f"Failed to read DOCX: {e}")
+        yield 1, text
 
     elif file_type == "txt":
         try:
@@ -56,8 +208,94 @@ def extract_text(file_data, file_type: str) -> str:
                     text = f.read()
         except Exception as e:
             raise ValueError(f"Failed to read TXT: {e}")
+        yield 1, text
 
     else:
         raise ValueError(f"Unsupported file type: {file_type}")
 
-    return text.strip()
\ No newline at end of file
+
+SUPPORTED_TYPES = ("pdf", "docx", "txt")
+MAX_ARCHIVE_BYTES = 1024 * 1024 * 1024  # refuse archives that expand past 1 GB
+
+
+def file_type_of(filename: str) -> str:
+    return filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+
+
+def iter_archive(data: bytes):
+    """Yield (filename, bytes) for every supported document inside a ZIP archive."""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        members = [
+            m for m in archive.infolist()
+            if not m.is_dir()
+            and not m.filename.startswith("__MACOSX/")
+            and not os.path.basename(m.filename).startswith(".")
+            and file_type_of(m.filename) in SUPPORTED_TYPES
+        ]
+        if sum(m.file_size for m in members) > MAX_ARCHIVE_BYTES:
+            raise ValueError("ZIP archive is too large to extract.")
+        for member in members:
+            yield member.filename, archive.read(member)
+
+
+def _extract_file(filename, data):
+    """Worker: extract all pages of one file. Errors are returned as text so they pickle safely."""
+    try:
+        return list(iter_text(io.BytesIO(data), file_type_of(filename))), None
+    except Exception as e:
+        return None, str(e)
+
+
+def extract_many(files, workers=PDF_EXTRACT_WORKERS):
+    """
+    Extract many files in parallel on the shared process pool (see extraction_pool).
+
+    Args:
+        files: list of (filename, bytes)
+
+    Yields:
+        (filename, pages, error) as each file finishes; pages is a list of
+        (page_number, text) or None when extraction failed
+    """
+    if workers <= 1 or len(files) <= 1:
+        for filename, data in files:
+            yield (filename, *_extract_file(filename, data))
+        return
+
+    pool = extraction_pool(workers)
+    futures = {pool.submit(_extract_file, filename, data): filename for filename, data in files}
+    try:
+        for future in as_completed(futures):
+            try:
+                pages, error = future.result()
+            except Exception as e:  # worker crashed
+                pages, error = None, str(e)
+            yield futures[future], pages, error
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def limit_chars(pages, max_chars: int):
+    """Pass pages through, raising DocumentTooLargeError once more than max_chars have been seen."""
+    total = 0
+    for page_number, text in pages:
+        total += len(text)
+        if total > max_chars:
+            raise DocumentTooLargeError(f"This document is too large (over {max_chars} chars).")
+        yield page_number, text
+
+
+def extract_text(file_data, file_type: str, workers: int = 1) -> str:
+    """
+    Extract text from PDF, DOCX, or TXT files.
+
+    Args:
+        file_data: Uploaded file object or file path
+        file_type: 'pdf', 'docx', 'txt'
+        workers: processes used to extract large PDFs (1 = extract in this process)
+
+    Returns:
+        str: Extracted text
+    """
+    return "".join(text for _, text in iter_text(file_data, file_type, workers)).strip()
@@ -6,6 +6,8 @@ import json
 OPENAI_API_KEY=st.secrets["OPENAI_API_KEY"]
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+QUIZ_SOURCE_CHARS = 4000  # characters of the document the questions are generated from
+
 def generate_questions(text: str, num_questions: int = 5):
     prompt = f"""
 Generate {num_questions} quiz questions based on the following text. 
@@ -21,7 +23,7 @@ Return a JSON array of questions. Each question must include:
 Respond only with the JSON array.
 
 Text:
-{text[:4000]}
+{text[:QUIZ_SOURCE_CHARS]}
 """
 
 
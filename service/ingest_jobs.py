@@ -0,0 +1,236 @@
+import io
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+
+import streamlit as st
+
+from service.extract_text import iter_text, limit_chars, extract_many, PDF_EXTRACT_WORKERS
+from service.qdrant_utils import save_to_qdrant, save_many_to_qdrant, update_document
+
+INGEST_WORKERS = 2  # documents ingested at the same time
+RETAIN_PAGES_MAX_CHARS = 2_000_000  # larger documents are re-extracted on retry instead of kept in memory
+
+
+@dataclass
+class IngestJob:
+    job_id: str
+    filename: str
+    file_type: str
+    data: bytes
+    metadata: dict
+    max_chars: int
+    status: str = "queued"          # queued | running | done | failed
+    stage: str = "extract"          # stage currently running, or the one that failed
+    extracted_pages: int = 0
+    embedded_chunks: int = 0
+    upserted_points: int = 0
+    extraction_done: bool = False
+    pages: list = field(default_factory=list)     # None once the document is too large to keep
+    point_ids: list = field(default_factory=list)
+    error: str = ""
+    attempts: int = 0
+    submitted_at: str = ""
+    finished_at: str = ""
+    files: list = field(default_factory=list)     # (filename, bytes) for bulk jobs
+    report: list = field(default_factory=list)    # per-file results of bulk jobs
+    document_id: str = ""                         # set when the job revises an existing document
+    summary: str = ""
+
+
+class IngestQueue:
+    """
+    Process-wide queue that runs document ingestion on a worker pool.
+
+    Each job extracts, chunks, embeds and upserts one document in the background. Extracted
+    pages of ordinary documents are kept until the job succeeds, so a job that fails while
+    embedding or upserting is retried without re-reading the file (embeddings of chunks
+    already done come from the embedding cache). Pages of very large documents are not
+    kept; their retries extract again.
+    """
+
+    def __init__(self, workers=INGEST_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, filename, file_type, data, metadata=None, max_chars=None, document_id=""):
+        """Queue one file. With document_id, the file replaces that document's stored version."""
+        job = IngestJob(
+            job_id=uuid.uuid4().hex[:8],
+            filename=filename,
+            file_type=file_type,
+            data=data,
+            metadata=metadata or {},
+            max_chars=max_chars,
+            submitted_at=_now(),
+            document_id=document_id
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def submit_bulk(self, files, max_chars=None):
+        """Queue many (filename, bytes) files as one job that shares an embedding stream."""
+        job = IngestJob(
+            job_id=uuid.uuid4().hex[:8],
+            filename=f"{len(files)} files",
+            file_type="bulk",
+            data=b"",
+            metadata={},
+            max_chars=max_chars,
+            submitted_at=_now(),
+            files=list(files)
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def retry(self, job_id):
+        """Re-queue a failed job; it resumes from the stage that failed."""
+        job = self._jobs.get(job_id)
+        if not job or job.status != "failed":
+            return False
+        job.status = "queued"
+        job.error = ""
+        self._pool.submit(self._run, job)
+        return True
+
+    def jobs(self):
+        """All known jobs, newest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.submitted_at, reverse=True)
+
+    def clear_finished(self):
+        with self._lock:
+            for job_id in [j.job_id for j in self._jobs.values() if j.status == "done"]:
+                del self._jobs[job_id]
+
+    def _pages(self, job):
+        """Pages to index: cached from a previous attempt, or freshly extracted and recorded."""
+        if job.extraction_done and job.pages is not None:
+            yield from job.pages
+            return
+
+        job.stage = "extract"
+        job.extraction_done = False
+        job.pages = []
+        job.extracted_pages = 0
+        retained_chars = 0
+        pages = iter_text(io.BytesIO(job.data), job.file_type, PDF_EXTRACT_WORKERS)
+        if job.max_chars:
+            pages = limit_chars(pages, job.max_chars)
+        for page in pages:
+            if job.pages is not None:
+                retained_chars += len(page[1])
+                if retained_chars > RETAIN_PAGES_MAX_CHARS:
+                    job.pages = None  # stream the rest without holding the document in memory
+                else:
+                    job.pages.append(page)
+            job.extracted_pages += 1
+            yield page
+        job.extraction_done = True
+
+    def _on_progress(self, job, embedded, upserted):
+        job.embedded_chunks = embedded
+        job.upserted_points = upserted
+        if job.extraction_done:
+            job.stage = "upsert" if embedded > upserted else "embed"
+
+    def _bulk_documents(self, job):
+        """Extract the job's files in parallel and hand each one on as soon as it is done."""
+        job.stage = "extract"
+        job.extracted_pages = 0
+        for filename, pages, error in extract_many(job.files):
+            if pages is not None:
+                job.extracted_pages += len(pages)
+                if job.max_chars and sum(len(text) for _, text in pages) > job.max_chars:
+                    pages, error = None, f"This document is too large (over {job.max_chars} chars)."
+            metadata = {"filename": filename, "upload_timestamp": datetime.utcnow().isoformat()}
+            yield filename, pages, metadata, error
+        job.extraction_done = True
+
+    def _run_bulk(self, job):
+        report = save_many_to_qdrant(
+            self._bulk_documents(job),
+            on_progress=lambda embedded, upserted: self._on_progress(job, embedded, upserted)
+        )
+        # Files the run never reached (it stopped on an embedding or upsert error) failed too
+        reached = {entry["filename"] for entry in report}
+        error = next((entry["error"] for entry in report if entry["status"] == "failed"), "Not processed.")
+        report += [
+            {"filename": name, "status": "failed", "document_id": None, "chunks": 0, "error": error}
+            for name, _ in job.files if name not in reached
+        ]
+        # Keep earlier successes; a retry only re-runs the files that failed
+        retried = {entry["filename"] for entry in report}
+        job.report = [entry for entry in job.report if entry["filename"] not in retried] + report
+        failed = {entry["filename"] for entry in report if entry["status"] != "stored"}
+        job.files = [(name, data) for name, data in job.files if name in failed]
+        job.extraction_done = False
+        if failed:
+            raise ValueError(f"{len(failed)} of {len(report)} files failed.")
+
+    def _run_single(self, job):
+        if job.document_id:
+            summary = update_document(
+                job.document_id,
+                self._pages(job),
+                job.metadata,
+                on_progress=lambda embedded, upserted: self._on_progress(job, embedded, upserted)
+            )
+            job.summary = (
+                f"{summary['unchanged']} chunks unchanged, {summary['added']} re-embedded, {summary['removed']} removed"
+            )
+            return
+        job.point_ids = save_to_qdrant(
+            self._pages(job),
+            job.filename,
+            job.metadata,
+            on_progress=lambda embedded, upserted: self._on_progress(job, embedded, upserted)
+        )
+        if not job.point_ids:
+            raise ValueError("The document could not be processed into text. Nothing was saved.")
+
+    def _run(self, job):
+        job.status = "running"
+        job.attempts += 1
+        job.embedded_chunks = 0
+        job.upserted_points = 0
+        start = time.time()
+        try:
+            if job.file_type == "bulk":
+                self._run_bulk(job)
+            else:
+                self._run_single(job)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            if job.extraction_done and job.stage == "extract":
+                job.stage = "embed"
+            print(f"Ingestion job {job.job_id} ({job.filename}) failed at {job.stage}: {e}")
+        else:
+            job.status = "done"
+            job.stage = "done"
+            # Release the upload and extracted text once the documents are stored
+            job.data = b""
+            job.pages = []
+            job.files = []
+            print(f"Ingestion job {job.job_id} ({job.filename}) finished in {time.time() - start:.2f}s")
+        finally:
+            job.finished_at = _now()
+
+
+def _now():
+    return datetime.now(timezone(timedelta(hours=8))).isoformat()
+
+
+@st.cache_resource
+def get_ingest_queue():
+    """The ingestion queue shared by every session in this process."""
+    return IngestQueue()
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+from qdrant_client import AsyncQdrantClient
+
+
+class AsyncQdrant:
+    """
+    AsyncQdrantClient running on its own event loop thread, usable from synchronous code.
+
+    Streamlit scripts and the ingestion workers are plain threads, so coroutines are handed
+    to the loop with submit() (returns a concurrent.futures.Future) or run() (waits for
+    the result). Many requests can be in flight at once over the client's connection pool,
+    or over one multiplexed HTTP/2 channel with gRPC.
+
+    Args:
+        client_factory: callable returning an AsyncQdrantClient; called once, on the loop
+    """
+
+    def __init__(self, client_factory):
+        self._client_factory = client_factory
+        self._client = None
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="qdrant-async", daemon=True).start()
+
+    @classmethod
+    def connect(cls, url, api_key=None, prefer_grpc=False, grpc_port=6334):
+        return cls(lambda: AsyncQdrantClient(url=url, api_key=api_key, prefer_grpc=prefer_grpc, grpc_port=grpc_port))
+
+    async def _get_client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def submit(self, fn):
+        """Schedule fn(client) (a coroutine function) on the loop and return a Future for its result."""
+        async def call():
+            return await fn(await self._get_client())
+        return asyncio.run_coroutine_threadsafe(call(), self._loop)
+
+    def run(self, fn):
+        return self.submit(fn).result()
+
+    def upsert(self, collection, points):
+        """Start an upsert; returns a Future that resolves once Qdrant has applied it."""
+        return self.submit(lambda client: client.upsert(collection_name=collection, points=points, wait=True))
+
+    def search(self, collection, vector, limit, query_filter=None, with_payload=True):
+        """Start a nearest-neighbour query; returns a Future resolving to the scored points."""
+        async def query(client):
+            response = await client.query_points(
+                collection_name=collection,
+                query=vector,
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=with_payload
+            )
+            return response.points
+        return self.submit(query)
@@ -0,0 +1,94 @@
+from qdrant_client.http import models
+
+SCROLL_PAGE_SIZE = 256
+CATALOG_FIELDS = ["filename", "upload_timestamp"]
+
+
+def match_filter(**fields):
+    """Filter matching every given payload field exactly, e.g. match_filter(chunk_index=0)."""
+    return models.Filter(must=[
+        models.FieldCondition(key=key, match=models.MatchValue(value=value))
+        for key, value in fields.items()
+    ])
+
+
+def document_filter(document_id, filename=None, upload_timestamp=None):
+    """
+    Every point of a document: chunks tagged with its document_id, plus its chunk-0 point by id.
+
+    For a legacy document (not yet run through tools.migrate_blob_store) pass its filename
+    and upload_timestamp to also match its untagged chunks, as tools.sweep_orphans does.
+    """
+    conditions = [
+        models.FieldCondition(key="document_id", match=models.MatchValue(value=str(document_id))),
+        models.HasIdCondition(has_id=[document_id])
+    ]
+    if filename is not None and upload_timestamp is not None:
+        conditions.append(models.Filter(
+            must=[
+                models.FieldCondition(key="filename", match=models.MatchValue(value=filename)),
+                models.FieldCondition(key="upload_timestamp", match=models.MatchValue(value=upload_timestamp)),
+                models.IsEmptyCondition(is_empty=models.PayloadField(key="document_id"))
+            ]
+        ))
+    return models.Filter(should=conditions)
+
+
+def scroll_points(client, collection, scroll_filter, payload_fields, page_size=SCROLL_PAGE_SIZE, with_vectors=False):
+    """Yield every point matching scroll_filter, following next_page_offset until the end."""
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            scroll_filter=scroll_filter,
+            limit=page_size,
+            offset=offset,
+            with_payload=payload_fields,
+            with_vectors=with_vectors
+        )
+        yield from points
+        if offset is None:
+            return
+
+
+def list_documents(client, collection, payload_fields=CATALOG_FIELDS, page_size=SCROLL_PAGE_SIZE):
+    """
+    One entry per stored document: {"point_id": ..., <payload_fields>...}.
+
+    Only chunk-0 points are read, selected server-side through the chunk_index payload
+    index, so the cost depends on the number of documents and not on the number of chunks.
+    """
+    docs = []
+    for p in scroll_points(client, collection, match_filter(chunk_index=0), payload_fields, page_size):
+        payload = p.payload or {}
+        docs.append({"point_id": p.id, **{key: payload.get(key) for key in payload_fields}})
+    return docs
+
+
+def retrieve_payload(client, collection, point_id, payload_fields):
+    """Payload of a single point looked up directly by id, or None if it does not exist."""
+    points = client.retrieve(
+        collection_name=collection,
+        ids=[point_id],
+        with_payload=payload_fields,
+        with_vectors=False
+    )
+    return (points[0].payload or {}) if points else None
+
+
+def chunk_passages(client, collection, scroll_filter, payload_fields=("chunk_index", "chunk_text"),
+                   page_size=SCROLL_PAGE_SIZE):
+    """(chunk_text, payload) pairs of every chunk matching scroll_filter, in chunk_index order."""
+    fields = list(dict.fromkeys(["chunk_index", "chunk_text", *payload_fields]))
+    chunks = []
+    for p in scroll_points(client, collection, scroll_filter, fields, page_size):
+        payload = p.payload or {}
+        if payload.get("chunk_text") is not None:
+            chunks.append((payload["chunk_text"], payload))
+    chunks.sort(key=lambda c: c[1].get("chunk_index", 0))
+    return chunks
+
+
+def chunk_texts(client, collection, scroll_filter, page_size=SCROLL_PAGE_SIZE):
+    """Texts of every chunk matching scroll_filter, in chunk_index order."""
+    return [text for text, _ in chunk_passages(client, collection, scroll_filter, page_size=page_size)]
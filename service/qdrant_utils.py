@@ -1,169 +1,657 @@
 import streamlit as st
+import asyncio
+import threading
 import uuid
+from concurrent.futures import Future
+import hashlib
 from datetime import datetime, timezone, timedelta
 
-
-# LangChain & Qdrant
-from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain.vectorstores import Qdrant as LCQdrant
-from langchain.text_splitter import CharacterTextSplitter
-
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from qdrant_client.http.models import PointIdsList, VectorParams, PayloadSchemaType
+from qdrant_client.http.models import PointIdsList, PayloadSchemaType
+
+from service.embedding_pipeline import embed_and_upsert, EMBED_BATCH_SIZE, EMBED_MAX_WORKERS
+from service.embedding_cache import EmbeddingCache, CachedEmbeddings, text_hash
+from service.blob_store import BlobStore
+from service.chunking import StructuredChunker, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS
+from service.qdrant_queries import (
+    list_documents, scroll_points, match_filter, document_filter, retrieve_payload, chunk_texts, chunk_passages
+)
+from service.document_catalog import DocumentCatalog
+from service.answer_cache import AnswerCache
+from service.context_packing import LexicalIndexCache, pack_context
+from service.reranking import RetrievalStage, create_reranker
+from service.qdrant_async import AsyncQdrant
+from service.collection_profiles import get_profile
+from service.resources import resource
+from service.settings import setting
+from service.embedding_providers import get_provider, default_dim, create_embeddings
+from service.sparse_vectors import SPARSE_VECTOR_NAME, document_vector, query_vector
 
-# Configurable qdrant host via secrets
-QDRANT_URL = st.secrets["QDRANT_URL"]
-QDRANT_API_KEY = st.secrets["QDRANT_API_KEY"]
-OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
+# Settings come from st.secrets, or environment variables of the same name (see settings.setting)
+# Backend: "remote" (a Qdrant server at QDRANT_URL), "local" (embedded, stored under QDRANT_PATH)
+# or "memory" (embedded, gone when the process exits); the embedded modes need no server
+QDRANT_MODE = setting("QDRANT_MODE", "remote")
+QDRANT_URL = setting("QDRANT_URL")
+QDRANT_API_KEY = setting("QDRANT_API_KEY")
+QDRANT_PATH = setting("QDRANT_PATH", "data/qdrant")
 
 QDRANT_COLLECTION = "documents"
 
+# Transport and client mode: gRPC (port 6334) instead of REST, and async mode, in which
+# ingestion upserts run concurrently and retrieval runs on an AsyncQdrantClient. Embedded
+# storage belongs to a single client, so async mode is remote only.
+QDRANT_PREFER_GRPC = setting("QDRANT_PREFER_GRPC", False, bool)
+QDRANT_GRPC_PORT = setting("QDRANT_GRPC_PORT", 6334, int)
+QDRANT_ASYNC = setting("QDRANT_ASYNC", True, bool) and QDRANT_MODE == "remote"
+
+# Quantization / HNSW / on-disk settings the collection is created with (see collection_profiles.PROFILES);
+# changing it for an existing collection needs tools.migrate_collection_profile
+QDRANT_COLLECTION_PROFILE = setting("QDRANT_COLLECTION_PROFILE", "default")
+
+# "hybrid": dense and BM25 sparse search fused by reciprocal rank (RRF) in one query, or "dense"
+RETRIEVAL_MODE = setting("RETRIEVAL_MODE", "hybrid")
+HYBRID_CANDIDATES = 20   # minimum candidates each side of a hybrid search contributes to the fusion
+# Search results pass through a retrieval stage (see reranking.RetrievalStage): RETRIEVAL_CANDIDATES
+# are fetched, optionally scored by RERANKER ("none", "bm25" or "cross-encoder", a local CPU model
+# via fastembed, RERANKER_MODEL), and maximal marginal relevance picks k that are not near-duplicates
+# of each other; MMR_LAMBDA=1 turns diversification off. See benchmarks.bench_reranking
+RETRIEVAL_CANDIDATES = setting("RETRIEVAL_CANDIDATES", 20, int)
+MMR_LAMBDA = setting("MMR_LAMBDA", 0.5, float)
+RERANKER = setting("RERANKER", "none")
+RERANKER_MODEL = setting("RERANKER_MODEL")
+
+# Embedding provider (see embedding_providers.PROVIDERS): "openai", "fastembed" (local CPU model)
+# or "hash" (deterministic, offline). The collection's vector size is EMBEDDING_DIM, by default
+# the model's full size; a smaller one (e.g. 512 with text-embedding-3-small) stores truncated
+# vectors, see benchmarks.bench_dimensions. Changing provider, model or size for an existing
+# collection needs tools.reembed_collection
+EMBEDDING_PROVIDER = setting("EMBEDDING_PROVIDER", "openai")
+EMBEDDING_MODEL = setting("EMBEDDING_MODEL", get_provider(EMBEDDING_PROVIDER).model)
+EMBEDDING_DIM = setting("EMBEDDING_DIM", default_dim(EMBEDDING_PROVIDER, EMBEDDING_MODEL), int)
+FASTEMBED_CACHE_PATH = setting("FASTEMBED_CACHE_PATH", ".cache/fastembed")
+OPENAI_API_KEY = setting("OPENAI_API_KEY")
+
+# On-disk embedding cache, keyed by (model, chunk hash)
+EMBEDDING_CACHE_PATH = setting("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MAX_MB = setting("EMBEDDING_CACHE_MAX_MB", 512, int)
+
+# Full document texts live here (compressed, one blob per document id), not in Qdrant payloads
+BLOB_STORE_PATH = setting("BLOB_STORE_PATH", "data/blobs")
+
+# Document metadata for listing; the source of truth for which documents exist
+CATALOG_PATH = setting("CATALOG_PATH", "data/catalog.sqlite3")
+
+# Learn-page answers reused for questions within ANSWER_CACHE_THRESHOLD cosine similarity of an
+# earlier one about the same document version (see answer_cache.AnswerCache)
+ANSWER_CACHE_ENABLED = setting("ANSWER_CACHE_ENABLED", True, bool)
+ANSWER_CACHE_PATH = setting("ANSWER_CACHE_PATH", ".cache/answers.sqlite3")
+ANSWER_CACHE_THRESHOLD = setting("ANSWER_CACHE_THRESHOLD", 0.95, float)
+ANSWER_CACHE_TTL_HOURS = setting("ANSWER_CACHE_TTL_HOURS", 24 * 7, float)
+ANSWER_CACHE_MAX_ENTRIES = setting("ANSWER_CACHE_MAX_ENTRIES", 5000, int)
+
+# Learn-page prompts get the best non-redundant passages that fit CONTEXT_TOKEN_BUDGET tokens
+# (see context_packing.pack_context); when search finds nothing, chunks are ranked by an
+# in-process lexical index, one per filename, kept for LEXICAL_INDEX_MAX_DOCUMENTS filenames
+CONTEXT_TOKEN_BUDGET = setting("CONTEXT_TOKEN_BUDGET", 3000, int)
+CONTEXT_REDUNDANCY = setting("CONTEXT_REDUNDANCY", 0.7, float)
+LEXICAL_INDEX_MAX_DOCUMENTS = setting("LEXICAL_INDEX_MAX_DOCUMENTS", 32, int)
+
 # === Qdrant setup ===
-client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
-vectorstore = LCQdrant(client=client, collection_name=QDRANT_COLLECTION, embeddings=embeddings)
-
-def ensure_collection():
-    """Ensure the collection exists and 'filename' payload is indexed for filtering."""
-    collections = [c.name for c in client.get_collections().collections]
-    
-    if QDRANT_COLLECTION not in collections:
+# Clients and stores are created on first use and shared by every session in the process
+def _create_client():
+    if QDRANT_MODE == "memory":
+        return QdrantClient(":memory:")
+    if QDRANT_MODE == "local":
+        return QdrantClient(path=QDRANT_PATH)
+    if QDRANT_MODE == "remote":
+        return QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, prefer_grpc=QDRANT_PREFER_GRPC, grpc_port=QDRANT_GRPC_PORT)
+    raise ValueError(f"Unknown QDRANT_MODE '{QDRANT_MODE}'. Choose remote, local or memory.")
+
+def _create_embeddings():
+    return CachedEmbeddings(
+        create_embeddings(EMBEDDING_PROVIDER, EMBEDDING_MODEL, EMBEDDING_DIM, OPENAI_API_KEY, FASTEMBED_CACHE_PATH),
+        EmbeddingCache(EMBEDDING_CACHE_PATH, max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024)
+    )
+
+client = resource("qdrant_client", _create_client)
+async_client = resource("qdrant_async_client", lambda: AsyncQdrant.connect(
+    QDRANT_URL, QDRANT_API_KEY, QDRANT_PREFER_GRPC, QDRANT_GRPC_PORT
+))
+embeddings = resource("embeddings", _create_embeddings)
+blob_store = resource("blob_store", lambda: BlobStore(BLOB_STORE_PATH))
+catalog = resource("catalog", lambda: DocumentCatalog(CATALOG_PATH))
+answer_cache = resource("answer_cache", lambda: AnswerCache(
+    ANSWER_CACHE_PATH, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL_HOURS * 3600, ANSWER_CACHE_MAX_ENTRIES
+))
+lexical_indexes = resource("lexical_indexes", lambda: LexicalIndexCache(LEXICAL_INDEX_MAX_DOCUMENTS))
+retrieval_stage = resource("retrieval_stage", lambda: RetrievalStage(
+    RETRIEVAL_CANDIDATES, MMR_LAMBDA, create_reranker(RERANKER, RERANKER_MODEL, FASTEMBED_CACHE_PATH)
+))
+
+# Payload fields indexed for filtering
+PAYLOAD_INDEXES = {
+    "filename": PayloadSchemaType.KEYWORD,
+    "document_id": PayloadSchemaType.KEYWORD,
+    "chunk_index": PayloadSchemaType.INTEGER,
+}
+
+_ready_collections = set()
+_sparse_collections = set()   # collections with the BM25 sparse vector, i.e. able to do hybrid search
+_bootstrap_lock = threading.Lock()
+
+def ensure_collection(collection_name=QDRANT_COLLECTION, profile_name=None):
+    """
+    Ensure the collection exists (created under the configured profile) and the PAYLOAD_INDEXES fields are indexed.
+
+    The check runs once per collection per process; later calls return without a round trip.
+    """
+    if collection_name in _ready_collections:
+        return
+    with _bootstrap_lock:
+        if collection_name in _ready_collections:
+            return
+        _bootstrap_collection(collection_name, profile_name or QDRANT_COLLECTION_PROFILE)
+        _ready_collections.add(collection_name)
+
+def forget_collection(collection_name=QDRANT_COLLECTION):
+    """Make the next ensure_collection check the collection again (after deleting or re-creating it)."""
+    _ready_collections.discard(collection_name)
+    _sparse_collections.discard(collection_name)
+
+def has_sparse_vectors(collection_name=QDRANT_COLLECTION):
+    """Whether points in the collection carry BM25 sparse vectors (checked on bootstrap)."""
+    ensure_collection(collection_name)
+    return collection_name in _sparse_collections
+
+def _bootstrap_collection(collection_name, profile_name):
+    indexed = {}
+    if client.collection_exists(collection_name):
+        info = client.get_collection(collection_name)
+        size = getattr(info.config.params.vectors, "size", None)
+        if size is not None and size != EMBEDDING_DIM:
+            raise ValueError(
+                f"Collection '{collection_name}' holds {size}-dim vectors but {EMBEDDING_PROVIDER} model "
+                f"'{EMBEDDING_MODEL}' makes {EMBEDDING_DIM}-dim ones. Run tools.reembed_collection."
+            )
+        indexed = info.payload_schema or {}
+        if SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {}):
+            _sparse_collections.add(collection_name)
+        else:
+            print(f"Collection '{collection_name}' has no sparse vectors; searches are dense only. "
+                  "Run tools.migrate_collection_profile to enable hybrid search.")
+    else:
+        profile = get_profile(profile_name)
         client.create_collection(
-            collection_name=QDRANT_COLLECTION,
-            vectors_config=models.VectorParams(size=1536, distance=models.Distance.COSINE)
+            collection_name=collection_name,
+            vectors_config=profile.vector_params(EMBEDDING_DIM),
+            hnsw_config=profile.hnsw_config(),
+            quantization_config=profile.quantization_config(),
+            sparse_vectors_config={SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)}
         )
-        print(f"Created collection '{QDRANT_COLLECTION}'")
+        _sparse_collections.add(collection_name)
+        print(f"Created collection '{collection_name}' with profile '{profile_name}'")
 
-    # Try to create payload index for 'filename'; ignore error if it already exists
-    try:
-        client.create_payload_index(
-            collection_name=QDRANT_COLLECTION,
-            field_name="filename",
-            field_schema=PayloadSchemaType.KEYWORD
-        )
-        print("Payload index on 'filename' created successfully")
-    except Exception as e:
-        if "already exists" in str(e):
-            print("Payload index on 'filename' already exists")
-        else:
-            print(f"Failed to create payload index: {e}")
+    # Create only the payload indexes that are missing
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        if field_name in indexed:
+            continue
+        try:
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema
+            )
+            print(f"Payload index on '{field_name}' created successfully")
+        except Exception as e:
+            if "already exists" in str(e):
+                print(f"Payload index on '{field_name}' already exists")
+            else:
+                print(f"Failed to create payload index on '{field_name}': {e}")
+
+def _upsert(points):
+    """Upsert one batch: in async mode returns a Future so several batches are written at once."""
+    if QDRANT_ASYNC:
+        return async_client.upsert(QDRANT_COLLECTION, points)
+    client.upsert(collection_name=QDRANT_COLLECTION, points=points)
 
 def list_qdrant_docs():
-    ensure_collection()
+    """
+    One entry per ready document (point_id, filename, upload_timestamp, counts), from the local catalog.
+
+    The catalog is filled from the collection the first time it is used; after that listing
+    never touches Qdrant.
+    """
     try:
-        points, _ = client.scroll(
-            collection_name=QDRANT_COLLECTION,
-            limit=500,
-            with_payload=True,
-            with_vectors=False
-        )
-        docs = []
-        for p in points:
-            payload = p.payload or {}
-            filename = payload.get("filename")
-            upload_ts = payload.get("upload_timestamp")
-            if filename and payload.get("chunk_index") == 0:  # only list once per doc
-                docs.append({
-                    "point_id": p.id,
-                    "filename": filename,
-                    "upload_timestamp": upload_ts
-                })
-        return docs
+        if not catalog.is_synced():
+            sync_catalog()
+        return [{"point_id": row.pop("id"), **row} for row in catalog.list()]
     except Exception as e:
         st.error(f"Error fetching documents: {e}")
         return []
 
-def save_to_qdrant(doc_text, filename, metadata=None, chunk_size=2000, chunk_overlap=0, batch_size=50):
+def sync_catalog():
+    """
+    Rebuild the catalog from the chunk-0 points in Qdrant.
+
+    Fields only the catalog knows (char_count, content_hash) are kept for documents it
+    already has, and documents still being ingested stay listed as such.
+    """
     ensure_collection()
-    
-    # Split document into chunks
-    splitter = CharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap
-    )
-    chunks = splitter.split_text(doc_text)
+    fields = ["filename", "upload_timestamp", "updated_timestamp"]
+    existing = {row["id"]: row for row in catalog.list(None)}
+    rows = []
+    for doc in list_documents(client, QDRANT_COLLECTION, fields):
+        if not doc["filename"]:
+            continue
+        document_id = str(doc.pop("point_id"))
+        chunk_count = client.count(
+            collection_name=QDRANT_COLLECTION,
+            count_filter=match_filter(document_id=document_id),
+            exact=True
+        ).count
+        rows.append({**existing.get(document_id, {}), "id": document_id, "status": "ready", "chunk_count": chunk_count, **doc})
+    known = {row["id"] for row in rows}
+    rows += [row for row in existing.values() if row["status"] == "ingesting" and row["id"] not in known]
+    catalog.replace_all(rows)
+    print(f"Synced document catalog: {len(known)} documents")
 
-    point_ids = []
-    points = []
+def _document_points(document_id, filename, pages, metadata, chunker, point_ids, info, blob):
+    """
+    Yield pending points for one document while streaming its full text into blob.
+
+    The first chunk's point id doubles as the document id. Every chunk carries only what
+    retrieval needs (document_id, filename, chunk_index, chunk_text, page/section location)
+    plus, when the collection supports it, a BM25 sparse vector of the chunk text;
+    document-level metadata sits on the first chunk and the full text goes to the blob store.
+    Ids are appended to point_ids as points are produced; once the stream is exhausted, info
+    holds the catalog fields (upload_timestamp, char_count, content_hash). Nothing but the
+    current page and the chunk being built is held in memory.
+
+    blob is a blob_store.begin() for document_id; the caller commits it once the points are
+    stored, or discards it.
+    """
+    pages = [(1, pages)] if isinstance(pages, str) else pages
+    sparse = has_sparse_vectors()
+    upload_ts = datetime.now(timezone(timedelta(hours=8))).isoformat()
 
-    for idx, chunk in enumerate(chunks):
-        point_id = uuid.uuid4().hex
-        vector = embeddings.embed_query(chunk)
+    # keep full text for quiz generation
+    content_hash = hashlib.sha256()
+    char_count = 0
+
+    def collect(pages):
+        nonlocal char_count
+        for page_number, page_text in pages:
+            blob.write(page_text)
+            content_hash.update(page_text.encode("utf-8"))
+            char_count += len(page_text)
+            yield page_number, page_text
+
+    # Split document into chunks along pages, headings and paragraphs
+    for idx, chunk in enumerate(chunker.chunk(collect(pages))):
+        point_id = document_id if idx == 0 else str(uuid.uuid4())
         payload = {
+            "document_id": document_id,
             "filename": filename,
-            "upload_timestamp": datetime.now(timezone(timedelta(hours=8))).isoformat(),
             "chunk_index": idx,
-            "chunk_text": chunk
+            "chunk_text": chunk.text,
+            "chunk_hash": text_hash(chunk.text),
+            "page": chunk.page,
+            "page_end": chunk.page_end,
+            "section": chunk.section,
+            "token_count": chunk.token_count
         }
         if idx == 0:
-            payload["document_text"] = doc_text  # keep full text for quiz generation
-        if metadata:
-            payload.update(metadata)
-
-        points.append({
-            "id": point_id,
-            "vector": vector,
-            "payload": payload
-        })
+            payload["upload_timestamp"] = upload_ts
+            if metadata:
+                payload.update(metadata)
+            info["upload_timestamp"] = payload["upload_timestamp"]
         point_ids.append(point_id)
+        yield {
+            "id": point_id,
+            "text": chunk.text,
+            "payload": payload,
+            "sparse_vectors": {SPARSE_VECTOR_NAME: document_vector(chunk.text)} if sparse else None
+        }
+
+    blob.close()
+    info["char_count"] = char_count
+    info["content_hash"] = content_hash.hexdigest()
+
+def save_to_qdrant(doc_text, filename, metadata=None, chunk_tokens=CHUNK_TOKENS, chunk_overlap_tokens=CHUNK_OVERLAP_TOKENS,
+                   batch_size=EMBED_BATCH_SIZE, max_workers=EMBED_MAX_WORKERS, on_progress=None):
+    """
+    Chunk, embed and store a document in Qdrant.
+
+    Args:
+        doc_text: full text, or an iterable of (page_number, text) pairs such as
+            extract_text.iter_text(); pages are chunked and embedded while extraction runs
+        filename: document name stored with every chunk
+        metadata: extra document-level payload stored on the first chunk
+        chunk_tokens / chunk_overlap_tokens: chunk size and overlap, in tokens
+        on_progress: optional callable(embedded, upserted) with running chunk totals
+
+    Returns:
+        list: point ids of the stored chunks (empty if the document has no text);
+        the first id is the document id
+    """
+    ensure_collection()
 
-        # Upsert in batches
-        if len(points) >= batch_size:
-            client.upsert(collection_name=QDRANT_COLLECTION, points=points)
-            points = []
+    chunker = StructuredChunker(max_tokens=chunk_tokens, overlap_tokens=chunk_overlap_tokens)
+    document_id = str(uuid.uuid4())
+    point_ids = []
+    info = {}
+    blob = blob_store.begin(document_id)
+    catalog.add(document_id, filename, (metadata or {}).get("upload_timestamp"))
 
-    # Upsert remaining points
-    if points:
-        client.upsert(collection_name=QDRANT_COLLECTION, points=points)
-    
+    try:
+        # Embed in batches through the batch API and upsert each batch once its vectors arrive
+        embed_and_upsert(
+            _document_points(document_id, filename, doc_text, metadata, chunker, point_ids, info, blob),
+            embeddings,
+            upsert=_upsert,
+            batch_size=batch_size,
+            max_workers=max_workers,
+            on_progress=on_progress
+        )
+    except Exception:
+        # Don't leave a half-ingested document behind
+        blob.discard()
+        delete_multiple_from_qdrant(point_ids)
+        catalog.remove([document_id])
+        raise
+
+    if point_ids:
+        blob.commit()
+        catalog.update(document_id, status="ready", chunk_count=len(point_ids), **info)
+        _documents_changed([])
+    else:
+        blob.discard()
+        catalog.remove([document_id])
+    print(f"Stored {len(point_ids)} chunks for '{filename}'. Embedding cache: {embedding_cache_stats()}")
     return point_ids
 
+def save_many_to_qdrant(documents, chunk_tokens=CHUNK_TOKENS, chunk_overlap_tokens=CHUNK_OVERLAP_TOKENS,
+                        batch_size=EMBED_BATCH_SIZE, max_workers=EMBED_MAX_WORKERS, on_progress=None):
+    """
+    Store many documents through one shared embedding/upsert stream.
+
+    Chunks of consecutive documents share embedding batches, so small files do not each pay
+    for a half-empty request. A document whose extraction fails is rolled back and reported
+    without stopping the others; if embedding or upserting fails, every document in the run
+    is rolled back.
+
+    Args:
+        documents: iterable of (filename, pages, metadata, error); pages as accepted by
+            save_to_qdrant, or None together with an error message from extraction
+
+    Returns:
+        list: one report per file with filename, status ('stored' | 'empty' | 'failed'),
+        document_id, chunks and error; if embedding or upserting fails, files the stream had
+        not reached yet are not reported (the stream is closed, not drained)
+    """
+    ensure_collection()
+
+    chunker = StructuredChunker(max_tokens=chunk_tokens, overlap_tokens=chunk_overlap_tokens)
+    documents = iter(documents)
+    report = []
+    point_ids_by_file = []
+
+    def stream():
+        for filename, pages, metadata, error in documents:
+            entry = {"filename": filename, "status": "failed", "document_id": None, "chunks": 0, "error": error or ""}
+            report.append(entry)
+            if pages is None:
+                continue
+            document_id = str(uuid.uuid4())
+            point_ids = []
+            info = {}
+            blob = blob_store.begin(document_id)
+            point_ids_by_file.append((entry, document_id, point_ids, info, blob))
+            catalog.add(document_id, filename, (metadata or {}).get("upload_timestamp"))
+            try:
+                yield from _document_points(document_id, filename, pages, metadata, chunker, point_ids, info, blob)
+            except Exception as e:
+                entry["error"] = str(e)
+                continue
+            entry["status"] = "stored" if point_ids else "empty"
+            entry["document_id"] = point_ids[0] if point_ids else None
+            entry["chunks"] = len(point_ids)
+            if not point_ids:
+                entry["error"] = "The document could not be processed into text."
+
+    try:
+        embed_and_upsert(
+            stream(),
+            embeddings,
+            upsert=_upsert,
+            batch_size=batch_size,
+            max_workers=max_workers,
+            on_progress=on_progress
+        )
+    except Exception as e:
+        for entry, document_id, point_ids, _, blob in point_ids_by_file:
+            blob.discard()
+            delete_multiple_from_qdrant(point_ids)
+            catalog.remove([document_id])
+            entry.update(status="failed", document_id=None, chunks=0, error=str(e))
+        # Stop the producer (e.g. extraction of the remaining files) instead of draining it
+        if hasattr(documents, "close"):
+            documents.close()
+        return report
+
+    # Roll back files whose extraction failed part-way through; the rest are now listed
+    for entry, document_id, point_ids, info, blob in point_ids_by_file:
+        if entry["status"] == "stored":
+            blob.commit()
+            catalog.update(document_id, status="ready", chunk_count=len(point_ids), **info)
+            continue
+        blob.discard()
+        delete_multiple_from_qdrant(point_ids)
+        catalog.remove([document_id])
+
+    stored = sum(1 for entry in report if entry["status"] == "stored")
+    if stored:
+        _documents_changed([])
+    print(f"Stored {stored}/{len(report)} documents. Embedding cache: {embedding_cache_stats()}")
+    return report
+
+def update_document(document_id, doc_text, metadata=None, chunk_tokens=CHUNK_TOKENS,
+                    chunk_overlap_tokens=CHUNK_OVERLAP_TOKENS, on_progress=None):
+    """
+    Replace a stored document with a revised version, touching only the chunks that changed.
+
+    The new version is chunked and each chunk hash is compared with the stored chunks.
+    Unchanged chunks keep their points and vectors (only their position payload is
+    updated), new chunks are embedded and upserted, and chunks that disappeared are
+    deleted. The document id, and with it every quiz pointing at it, stays the same.
+    The stored full text is only replaced once all of that has succeeded.
+
+    Args:
+        document_id: id of the stored document (its chunk-0 point id)
+        doc_text: full text, or an iterable of (page_number, text) pairs
+        metadata: document-level payload to merge into chunk 0
+
+    Returns:
+        dict: counts of unchanged, added and removed chunks
+    """
+    ensure_collection()
+    document_id = str(document_id)
+
+    existing = {}   # chunk_hash -> [point ids], excluding chunk 0 which is always rewritten in place
+    stored_zero = None
+    fields = ["chunk_hash", "chunk_text", "chunk_index", "filename", "upload_timestamp"]
+    for p in scroll_points(client, QDRANT_COLLECTION, match_filter(document_id=document_id), fields):
+        payload = p.payload or {}
+        chunk_hash = payload.get("chunk_hash") or text_hash(payload.get("chunk_text") or "")
+        if str(p.id) == document_id:
+            stored_zero = (chunk_hash, payload)
+        else:
+            existing.setdefault(chunk_hash, []).append(p.id)
+    if stored_zero is None:
+        raise ValueError(f"Document {document_id} was not found. Run tools.migrate_blob_store for older documents.")
+    zero_hash, zero_payload = stored_zero
+
+    chunker = StructuredChunker(max_tokens=chunk_tokens, overlap_tokens=chunk_overlap_tokens)
+    updated_ts = datetime.now(timezone(timedelta(hours=8))).isoformat()
+    new_ids = []
+    added_ids = []
+    position_updates = []
+    unchanged = 0
+
+    # Chunk 0 is rewritten in place; keep the stored point to put back if the update fails
+    old_zero = client.retrieve(collection_name=QDRANT_COLLECTION, ids=[document_id], with_payload=True, with_vectors=True)[0]
+
+    # The new full text goes to a staged blob, committed after the chunks are stored
+    info = {}
+    blob = blob_store.begin(document_id)
+
+    def changed_points():
+        nonlocal unchanged
+        points = _document_points(document_id, zero_payload.get("filename"), doc_text, None, chunker, new_ids, info, blob)
+        for point in points:
+            payload = point["payload"]
+            if payload["chunk_index"] == 0:
+                point["id"] = document_id
+                payload["upload_timestamp"] = zero_payload.get("upload_timestamp", payload["upload_timestamp"])
+                payload["updated_timestamp"] = updated_ts
+                if metadata:
+                    payload.update(metadata)
+                if payload["chunk_hash"] == zero_hash:
+                    unchanged += 1
+                    position_updates.append((document_id, payload))
+                    continue
+            elif existing.get(payload["chunk_hash"]):
+                unchanged += 1
+                position_updates.append((existing[payload["chunk_hash"]].pop(), {
+                    key: payload[key] for key in ("chunk_index", "page", "page_end", "section", "token_count")
+                }))
+                continue
+            added_ids.append(point["id"])
+            yield point
+
+    try:
+        # New chunks are embedded and upserted while the revision is still being chunked
+        embed_and_upsert(
+            changed_points(),
+            embeddings,
+            upsert=_upsert,
+            on_progress=on_progress
+        )
+        if not new_ids:
+            raise ValueError("The revised document could not be processed into text. Nothing was changed.")
+        removed = [point_id for ids in existing.values() for point_id in ids]
+        if position_updates:
+            client.batch_update_points(
+                collection_name=QDRANT_COLLECTION,
+                update_operations=[
+                    models.SetPayloadOperation(set_payload=models.SetPayload(payload=payload, points=[point_id]))
+                    for point_id, payload in position_updates
+                ]
+            )
+        if removed:
+            client.delete(collection_name=QDRANT_COLLECTION, points_selector=PointIdsList(points=removed))
+        blob.commit()
+    except Exception:
+        # Keep the stored full text, drop chunks added for the revision and restore chunk 0
+        blob.discard()
+        added = [point_id for point_id in added_ids if point_id != document_id]
+        if added:
+            client.delete(collection_name=QDRANT_COLLECTION, points_selector=PointIdsList(points=added))
+        if document_id in added_ids or position_updates:
+            client.upsert(collection_name=QDRANT_COLLECTION, points=[
+                models.PointStruct(id=old_zero.id, vector=old_zero.vector, payload=old_zero.payload)
+            ])
+        raise
+
+    catalog_fields = {
+        "chunk_count": len(new_ids),
+        "char_count": info["char_count"],
+        "content_hash": info["content_hash"],
+        "updated_timestamp": updated_ts
+    }
+    if not catalog.update(document_id, status="ready", **catalog_fields):
+        catalog.add(document_id, zero_payload.get("filename"), zero_payload.get("upload_timestamp"),
+                    status="ready", **catalog_fields)
+
+    _documents_changed([document_id])
+
+    summary = {"document_id": document_id, "unchanged": unchanged, "added": len(added_ids), "removed": len(removed)}
+    print(f"Updated document {document_id}: {summary}")
+    return summary
+
+def embedding_cache_stats():
+    """Hit/miss counters of the embedding cache since the process started."""
+    return embeddings.stats()
 
 def delete_multiple_from_qdrant(point_ids):
-    """Deletes multiple documents from Qdrant using their point_ids."""
+    """Deletes multiple documents from Qdrant using their point_ids, along with any stored full texts."""
     try:
         if point_ids:
             client.delete(
                 collection_name=QDRANT_COLLECTION,
                 points_selector=PointIdsList(points=point_ids)
             )
+            for point_id in point_ids:
+                blob_store.delete(str(point_id))
+            catalog.remove(point_ids)
+            _documents_changed(point_ids)
         return True
     except Exception as e:
         st.error(f"Error deleting documents: {e}")
         return False
 
-def get_document_text(point_id=None, filename=None):
+def delete_document(document_id):
     """
-    Retrieve document text from Qdrant.
-    Can fetch by point_id (first chunk) or by filename (all chunks concatenated).
+    Delete a document: every one of its points (in one filter-based request), its full text
+    and its catalog row. Untagged chunks of a legacy document are matched on its filename
+    and upload_timestamp.
+
+    Returns:
+        int: number of points deleted, or None if the delete failed
     """
     try:
-        points, _ = client.scroll(
+        zero = retrieve_payload(client, QDRANT_COLLECTION, document_id, ["document_id", "filename", "upload_timestamp"])
+        if zero is not None and not zero.get("document_id"):
+            if not zero.get("upload_timestamp"):
+                raise ValueError("this legacy document's chunks cannot be told apart from other uploads of the same file. "
+                                 "Run tools.migrate_blob_store first.")
+            points_filter = document_filter(document_id, zero.get("filename"), zero["upload_timestamp"])
+        else:
+            points_filter = document_filter(document_id)
+        count = client.count(collection_name=QDRANT_COLLECTION, count_filter=points_filter, exact=True).count
+        client.delete(
             collection_name=QDRANT_COLLECTION,
-            limit=1000,
-            with_payload=True,
-            with_vectors=False
+            points_selector=models.FilterSelector(filter=points_filter)
         )
-        chunks = []
-
-        for p in points:
-            payload = p.payload or {}
-
-            # If fetching by point_id
-            if point_id and p.id == point_id:
-                doc_text = payload.get("document_text") or payload.get("chunk_text")
-                return doc_text if doc_text else ""
+        blob_store.delete(str(document_id))
+        catalog.remove([document_id])
+        _documents_changed([document_id])
+        print(f"Deleted document {document_id}: {count} points")
+        return count
+    except Exception as e:
+        st.error(f"Error deleting document: {e}")
+        return None
 
-            # If fetching by filename
-            if filename and payload.get("filename") == filename:
-                chunk_text = payload.get("chunk_text") or payload.get("document_text")
-                if chunk_text:
-                    chunks.append(chunk_text)
+def get_document_text(point_id=None, filename=None, max_chars=None):
+    """
+    Retrieve document text.
+    Can fetch by point_id (first chunk / document id) or by filename (all chunks concatenated).
+    Full texts come from the blob store; documents ingested before it existed fall back to
+    the legacy chunk-0 payload. max_chars limits how much of a stored blob is decompressed.
+    """
+    try:
+        if point_id:
+            doc_text = blob_store.get(str(point_id), max_chars=max_chars)
+            if doc_text is not None:
+                return doc_text
+            payload = retrieve_payload(client, QDRANT_COLLECTION, point_id, ["document_text", "chunk_text"])
+            if payload is not None:
+                return payload.get("document_text") or payload.get("chunk_text") or ""
 
-        # Concatenate all chunks if fetching by filename
-        if filename and chunks:
-            return "\n".join(chunks)
+        if filename:
+            # Concatenate all chunks of the file in order
+            return "\n".join(chunk_texts(client, QDRANT_COLLECTION, match_filter(filename=filename)))
 
         return ""
     except Exception as e:
@@ -171,23 +659,135 @@ def get_document_text(point_id=None, filename=None):
         return ""
 
 
-def build_vectorstore() -> LCQdrant:
-    """Create a LangChain Qdrant vectorstore for retrieval."""
-    return LCQdrant(client=client, collection_name=QDRANT_COLLECTION, embeddings=embeddings)
+# Payload fields of a passage shown on the Learn page
+PASSAGE_FIELDS = ["chunk_text", "filename", "chunk_index", "page", "page_end", "section", "token_count"]
+
+def search_passages(question, filename, k=4, mode=None):
+    """
+    Start a search for question among the chunks of one file.
+
+    In hybrid mode (RETRIEVAL_MODE, or mode="hybrid"|"dense" for this call) dense and BM25
+    sparse candidates are fetched in the same Qdrant query and fused by reciprocal rank, so
+    exact terms such as definitions, acronyms and numbers are found as well as paraphrases.
+    Collections without sparse vectors are searched dense only. The results go through the
+    retrieval stage (RETRIEVAL_CANDIDATES, RERANKER, MMR_LAMBDA), which over-fetches and
+    keeps k relevant passages that are not near-duplicates of each other.
+
+    Returns a Future resolving to up to k (chunk_text, payload) pairs, best first. In async
+    mode the question is embedded and searched on the async client's event loop, so the
+    caller is free to do other work meanwhile.
+    """
+    stage = retrieval_stage.instance()
+    limit = max(k, stage.candidates)
+    file_filter = match_filter(filename=filename)
+    search_params = get_profile(QDRANT_COLLECTION_PROFILE).search_params()
+    sparse_query = None
+    if (mode or RETRIEVAL_MODE) == "hybrid" and has_sparse_vectors():
+        sparse_query = query_vector(question)
+
+    def request(vector):
+        if sparse_query is None:
+            return {"query": vector, "query_filter": file_filter, "search_params": search_params}
+        candidates = max(HYBRID_CANDIDATES, 4 * k, limit)
+        return {
+            "prefetch": [
+                models.Prefetch(query=vector, filter=file_filter, params=search_params, limit=candidates),
+                models.Prefetch(query=sparse_query, using=SPARSE_VECTOR_NAME, filter=file_filter, limit=candidates),
+            ],
+            "query": models.FusionQuery(fusion=models.Fusion.RRF),
+        }
+
+    def passages(points):
+        candidates = [
+            (p.payload["chunk_text"], p.payload, p.score, p.vector.get("") if isinstance(p.vector, dict) else p.vector)
+            for p in points if (p.payload or {}).get("chunk_text")
+        ]
+        return stage.select(question, candidates, k)
+
+    if QDRANT_ASYNC:
+        async def search(aclient):
+            vector = await asyncio.to_thread(embeddings.embed_query, question)
+            response = await aclient.query_points(
+                collection_name=QDRANT_COLLECTION, limit=limit, with_payload=PASSAGE_FIELDS,
+                with_vectors=stage.needs_vectors, **request(vector)
+            )
+            if stage.reranker is not None:   # CPU-bound; keep the event loop free
+                return await asyncio.to_thread(passages, response.points)
+            return passages(response.points)
+        return async_client.submit(search)
+
+    future = Future()
+    try:
+        response = client.query_points(
+            collection_name=QDRANT_COLLECTION,
+            limit=limit,
+            with_payload=PASSAGE_FIELDS,
+            with_vectors=stage.needs_vectors,
+            **request(embeddings.embed_query(question))
+        )
+        future.set_result(passages(response.points))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def cached_answer(document_id, question):
+    """
+    A stored answer to a question similar enough to question about this version of the
+    document, or None (see AnswerCache.lookup). Cache failures are reported as misses.
+    """
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    try:
+        row = catalog.get(document_id) or {}
+        vector = embeddings.embed_query(question)
+        return answer_cache.lookup(document_id, row.get("content_hash"), embeddings.model, question, vector)
+    except Exception as e:
+        print(f"Answer cache lookup failed: {e}")
+        return None
+
+def cache_answer(document_id, question, answer, passages, seconds):
+    """Remember an answer and the (text, metadata) passages it came from for similar questions."""
+    if not ANSWER_CACHE_ENABLED:
+        return
+    try:
+        row = catalog.get(document_id) or {}
+        vector = embeddings.embed_query(question)   # already in the embedding cache from the search
+        answer_cache.put(document_id, row.get("content_hash"), embeddings.model, question, vector, answer, passages, seconds)
+    except Exception as e:
+        print(f"Could not cache answer: {e}")
+
+def answer_cache_stats():
+    """Hit/miss counters of the answer cache since the process started, and the time saved."""
+    return answer_cache.stats()
 
+def _documents_changed(document_ids):
+    """Forget what was derived from the stored chunks: cached answers and lexical indexes."""
+    if lexical_indexes.is_created:
+        lexical_indexes.clear()
+    if ANSWER_CACHE_ENABLED and document_ids:
+        dropped = answer_cache.invalidate(document_ids)
+        if dropped:
+            print(f"Dropped {dropped} cached answers")
 
 def get_document_chunks(filename):
-    points, _ = client.scroll(
-        collection_name=QDRANT_COLLECTION,
-        limit=1000,
-        with_payload=True,
-        with_vectors=False
-    )
-    chunks = []
-    for p in points:
-        payload = p.payload or {}
-        if payload.get("filename") == filename and payload.get("chunk_text") is not None:
-            chunks.append((payload.get("chunk_index", 0), payload["chunk_text"]))
-    # Sort by chunk_index
-    chunks.sort(key=lambda x: x[0])
-    return [c[1] for c in chunks]  # return only text
\ No newline at end of file
+    """Chunk texts of every document stored under filename, in chunk_index order."""
+    return chunk_texts(client, QDRANT_COLLECTION, match_filter(filename=filename))
+
+def rank_document_chunks(question, filename):
+    """
+    Every chunk stored under filename as (chunk_text, payload) pairs, ranked for question by
+    BM25 over the file's chunks (see context_packing.LexicalIndex): matching chunks first,
+    the rest in document order. Needs no embedding and no search; the index is built from
+    one scroll on first use and kept until documents are stored, updated or deleted.
+    """
+    index = lexical_indexes.get(filename, lambda: chunk_passages(
+        client, QDRANT_COLLECTION, match_filter(filename=filename), PASSAGE_FIELDS
+    ))
+    return index.rank(question)
+
+def pack_passages(passages, max_passages=None):
+    """
+    The best non-redundant passages of a ranked list that fit CONTEXT_TOKEN_BUDGET, as
+    ((chunk_text, payload) pairs, total tokens); see context_packing.pack_context.
+    """
+    return pack_context(passages, CONTEXT_TOKEN_BUDGET, max_passages, CONTEXT_REDUNDANCY)
@@ -0,0 +1,126 @@
+import numpy as np
+
+from service.context_packing import LexicalIndex
+
+
+class LexicalReranker:
+    """Scores candidates by BM25 against each other (see context_packing.LexicalIndex); offline and instant."""
+
+    model = "bm25"
+
+    def score(self, question, texts):
+        scores = LexicalIndex((text, None) for text in texts).scores(question)
+        return [scores.get(position, 0.0) for position in range(len(texts))]
+
+
+class CrossEncoderReranker:
+    """
+    Scores candidates with a local CPU cross-encoder from fastembed (ONNX Runtime), which
+    reads question and passage together. The model is downloaded to cache_dir on first use.
+    """
+
+    def __init__(self, model, cache_dir=None, threads=None, batch_size=32):
+        try:
+            from fastembed.rerank.cross_encoder import TextCrossEncoder
+        except ImportError:
+            raise ImportError("RERANKER 'cross-encoder' needs the fastembed package: pip install fastembed")
+        self.model = model
+        self.batch_size = batch_size
+        self._model = TextCrossEncoder(model_name=model, cache_dir=cache_dir, threads=threads)
+
+    def score(self, question, texts):
+        return [float(s) for s in self._model.rerank(question, texts, batch_size=self.batch_size)]
+
+
+# RERANKER name -> (class, default model)
+RERANKERS = {
+    "none": (None, None),
+    "bm25": (LexicalReranker, None),
+    "cross-encoder": (CrossEncoderReranker, "Xenova/ms-marco-MiniLM-L-6-v2"),
+}
+
+
+def create_reranker(name, model=None, cache_dir=None):
+    """The reranker registered under name, or None for "none"."""
+    if name not in RERANKERS:
+        raise ValueError(f"Unknown RERANKER '{name}'. Choose one of: {', '.join(RERANKERS)}.")
+    cls, default_model = RERANKERS[name]
+    if cls is None:
+        return None
+    if cls is CrossEncoderReranker:
+        return cls(model or default_model, cache_dir=cache_dir)
+    return cls()
+
+
+def _normalized(values):
+    values = np.asarray(values, dtype=np.float32)
+    spread = values.max() - values.min()
+    return (values - values.min()) / spread if spread > 0 else np.ones_like(values)
+
+
+def mmr(relevance, vectors, k, lambda_=0.5):
+    """
+    Positions of k candidates chosen by maximal marginal relevance.
+
+    Each step takes the candidate with the highest lambda_ * relevance - (1 - lambda_) *
+    its largest cosine similarity to the candidates already taken. relevance is scaled to
+    0..1 first; lambda_=1 keeps the relevance order. Candidates without a vector count as
+    unlike every other.
+    """
+    n = len(relevance)
+    relevance = _normalized(relevance) if n else np.zeros(0, dtype=np.float32)
+    if n <= 1 or lambda_ >= 1 or k <= 1:
+        return [int(i) for i in np.argsort(-relevance, kind="stable")[:k]]
+    dim = max((len(v) for v in vectors if v is not None), default=0)
+    matrix = np.zeros((n, dim), dtype=np.float32)
+    for i, vector in enumerate(vectors):
+        if vector is not None and len(vector) == dim:
+            matrix[i] = vector
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+    similarity = matrix @ matrix.T
+
+    selected = [int(np.argmax(relevance))]
+    closest = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(k, n):
+        scores = np.where(available, lambda_ * relevance - (1 - lambda_) * closest, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        closest = np.maximum(closest, similarity[best])
+    return selected
+
+
+class RetrievalStage:
+    """
+    What happens to search results before they reach the prompt.
+
+    Search fetches `candidates` passages instead of k. The reranker, if any, scores them
+    against the question (otherwise the search score is the relevance), and maximal marginal
+    relevance over the chunks' dense vectors then picks k that are relevant but not alike,
+    best first. candidates <= k with mmr_lambda=1 and no reranker is plain top-k.
+    """
+
+    def __init__(self, candidates=20, mmr_lambda=0.5, reranker=None):
+        self.candidates = candidates
+        self.mmr_lambda = mmr_lambda
+        self.reranker = reranker
+
+    @property
+    def needs_vectors(self):
+        return self.mmr_lambda < 1
+
+    def select(self, question, candidates, k):
+        """
+        candidates: (chunk_text, payload, search score, dense vector or None) tuples, best first.
+        Returns up to k (chunk_text, payload) pairs.
+        """
+        if not candidates:
+            return []
+        if self.reranker is not None:
+            relevance = self.reranker.score(question, [text for text, *_ in candidates])
+        else:
+            relevance = [score for _, _, score, _ in candidates]
+        order = mmr(relevance, [vector for *_, vector in candidates], k, self.mmr_lambda)
+        return [candidates[i][:2] for i in order]
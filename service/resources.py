@@ -0,0 +1,72 @@
+import threading
+import time
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Resource:
+    """
+    A process-wide object created on first use and then shared by every session.
+
+    Attribute access is forwarded to the object, so a Resource stands in for it directly
+    (`client.scroll(...)`); instance() returns the object itself. The factory runs at most
+    once, even when several threads ask for the object at the same time. The Resource's own
+    methods have names the wrapped objects do not use.
+    """
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._value = None
+        self._created = False
+        self._lock = threading.Lock()
+        self.seconds = None   # time the factory took, once created
+
+    def instance(self):
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    start = time.perf_counter()
+                    self._value = self._factory()
+                    self.seconds = time.perf_counter() - start
+                    self._created = True
+                    print(f"Created {self._name} in {self.seconds:.3f}s")
+        return self._value
+
+    def override(self, value):
+        """Use value instead of calling the factory (tests, benchmarks, tools)."""
+        with self._lock:
+            self._value = value
+            self._created = True
+            self.seconds = 0.0
+
+    def reset(self):
+        with self._lock:
+            self._value = None
+            self._created = False
+            self.seconds = None
+
+    @property
+    def is_created(self):
+        return self._created
+
+    def __getattr__(self, attr):
+        return getattr(self.instance(), attr)
+
+    def __repr__(self):
+        return f"<Resource {self._name} ({'created' if self._created else 'not created'})>"
+
+
+def resource(name, factory):
+    """Register (or return the already registered) resource called name."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Resource(name, factory)
+        return _registry[name]
+
+
+def resources():
+    """All registered resources by name."""
+    with _registry_lock:
+        return dict(_registry)
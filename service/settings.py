@@ -0,0 +1,28 @@
+import os
+
+import streamlit as st
+
+_TRUE = {"1", "true", "yes", "on"}
+
+
+def setting(name, default=None, cast=None):
+    """
+    Read a setting from st.secrets, falling back to the environment variable of the same
+    name and then to default.
+
+    Environment values are strings; cast converts them (bool understands 1/true/yes/on).
+    Without a secrets file at all only the environment and defaults are used, so scripts
+    and benchmarks can run with no secrets.
+    """
+    try:
+        if name in st.secrets:
+            value = st.secrets[name]
+            return cast(value) if cast and value is not None else value
+    except FileNotFoundError:
+        pass
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if cast is bool:
+        return value.strip().lower() in _TRUE
+    return cast(value) if cast else value
@@ -0,0 +1,58 @@
+import hashlib
+import re
+from collections import Counter
+
+from qdrant_client.http import models
+
+SPARSE_VECTOR_NAME = "bm25"
+
+# BM25 term-frequency saturation and length normalization; IDF is applied by Qdrant
+# (the sparse vector is configured with Modifier.IDF)
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_CHUNK_TERMS = 200   # typical terms per 400-token chunk once stopwords are dropped
+
+# Keeps acronyms, hyphenated terms and numbers with decimal points or separators together
+_TERM = re.compile(r"\w+(?:[.\-/]\w+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can do does for from had has have how i if in into is it its "
+    "of on or so than that the their then there these they this to was were what when where which "
+    "who why will with you your".split()
+)
+
+
+def terms(text):
+    """Lowercased terms of text without stopwords; a trailing plural 's' is dropped."""
+    result = []
+    for term in _TERM.findall(text.lower()):
+        if term in _STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss") and term.isalpha():
+            term = term[:-1]
+        result.append(term)
+    return result
+
+
+def term_id(term):
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def _sparse(weights):
+    return models.SparseVector(indices=list(weights), values=list(weights.values()))
+
+
+def document_vector(text):
+    """BM25 document-side weights of text's terms, as a sparse vector."""
+    counts = Counter(terms(text))
+    length = sum(counts.values())
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / AVG_CHUNK_TERMS)
+    weights = {}
+    for term, tf in counts.items():
+        weights[term_id(term)] = weights.get(term_id(term), 0.0) + tf * (BM25_K1 + 1) / (tf + norm)
+    return _sparse(weights)
+
+
+def query_vector(text):
+    """Each distinct query term with weight 1; None if the query has no terms left."""
+    weights = {term_id(term): 1.0 for term in terms(text)}
+    return _sparse(weights) if weights else None
@@ -59,6 +59,27 @@ def delete_quiz(quiz_id):
             return True
     return False
 
+def delete_sheet_rows(sheet, row_numbers):
+    """Delete the given 1-based rows, one request per run of consecutive rows, bottom-up so numbers stay valid."""
+    runs = []
+    for row in sorted(row_numbers, reverse=True):
+        if runs and runs[-1][0] == row + 1:
+            runs[-1][0] = row
+        else:
+            runs.append([row, row])
+    for start, end in runs:
+        sheet.delete_rows(start, end)
+
+def delete_quizzes_by_document(point_id):
+    """Delete every quiz generated from a document; returns the number of quizzes removed."""
+    sheet = get_gsheet()
+    point_id_col = sheet.col_values(2)
+    rows = [idx for idx, value in enumerate(point_id_col, start=1) if idx > 1 and value == point_id]
+    delete_sheet_rows(sheet, rows)
+    load_quizzes.clear()
+    load_quizzes_by_document.clear()
+    return len(rows)
+
 
 BASE62_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
 def to_base62(num: int) -> str:
@@ -3,6 +3,9 @@ import uuid
 import time
 import gspread
 from google.oauth2.service_account import Credentials
+from service.track_quiz import delete_sheet_rows
+
+RESULTS_ARCHIVE_WORKSHEET = "results_archive"
 
 @st.cache_resource(ttl=15)
 def get_results_gsheet():
@@ -77,6 +80,31 @@ def save_result(result):
     sheet.append_row(new_row)
     return True
 
+def archive_results_by_document(point_id):
+    """
+    Move every result for a document to the results archive worksheet (created on first use).
+
+    Students' scores are kept, but no longer show up next to the remaining documents.
+    Returns the number of results archived.
+    """
+    sheet = get_results_gsheet()
+    point_id_col = sheet.col_values(3)
+    rows = [idx for idx, value in enumerate(point_id_col, start=1) if idx > 1 and value == point_id]
+    if not rows:
+        return 0
+    values = sheet.get_all_values()
+    try:
+        archive = sheet.spreadsheet.worksheet(RESULTS_ARCHIVE_WORKSHEET)
+    except gspread.WorksheetNotFound:
+        archive = sheet.spreadsheet.add_worksheet(RESULTS_ARCHIVE_WORKSHEET, rows=1, cols=len(values[0]))
+        archive.append_row(values[0])
+    archive.append_rows([values[idx - 1] for idx in rows])
+    delete_sheet_rows(sheet, rows)
+    load_results_by_document.clear()
+    load_results_by_quiz_id.clear()
+    load_results_by_username.clear()
+    return len(rows)
+
 def string_to_uuid(s: str) -> uuid.UUID:
     return str(uuid.uuid5(uuid.NAMESPACE_DNS, s))
 
@@ -0,0 +1,82 @@
+"""
+Move full document texts out of the Qdrant collection into the blob store.
+
+For every legacy document (chunk 0 carrying `document_text`) this:
+  1. writes the full text to the blob store under the chunk-0 point id (the document id),
+  2. tags every chunk of the document with `document_id`,
+  3. removes `document_text` from chunk 0 and the duplicated `upload_timestamp` from the
+     other chunks.
+
+Chunks of a legacy upload are matched on (filename, upload_timestamp). Run from the repo
+root with the app's secrets available:
+
+    python -m tools.migrate_blob_store [--dry-run]
+"""
+import argparse
+from collections import defaultdict
+
+from service.qdrant_utils import client, blob_store, QDRANT_COLLECTION, ensure_collection
+from service.qdrant_queries import scroll_points
+
+
+def scroll_all(with_payload):
+    return scroll_points(client, QDRANT_COLLECTION, None, with_payload)
+
+
+def migrate(dry_run=False):
+    ensure_collection()
+
+    # Pass 1: blobs for every chunk 0 that still holds the full text
+    documents = {}
+    blobs_written = 0
+    for p in scroll_all(["filename", "upload_timestamp", "chunk_index", "document_text"]):
+        payload = p.payload or {}
+        if payload.get("chunk_index") != 0:
+            continue
+        doc_id = str(p.id)
+        documents[(payload.get("filename"), payload.get("upload_timestamp"))] = p.id
+        text = payload.get("document_text")
+        if text is not None and not blob_store.exists(doc_id):
+            if not dry_run:
+                blob_store.put(doc_id, text)
+            blobs_written += 1
+
+    # Pass 2: tag chunks with their document id and drop duplicated payload
+    by_document = defaultdict(list)
+    orphans = 0
+    for p in scroll_all(["filename", "upload_timestamp", "chunk_index", "document_id"]):
+        payload = p.payload or {}
+        if payload.get("document_id"):
+            continue
+        first_id = documents.get((payload.get("filename"), payload.get("upload_timestamp")))
+        if first_id is None:
+            orphans += 1
+            continue
+        by_document[first_id].append((p.id, payload.get("chunk_index")))
+
+    chunks_tagged = 0
+    for first_id, chunks in by_document.items():
+        doc_id = str(first_id)
+        ids = [point_id for point_id, _ in chunks]
+        rest = [point_id for point_id, chunk_index in chunks if chunk_index != 0]
+        chunks_tagged += len(ids)
+        if dry_run:
+            continue
+        client.set_payload(collection_name=QDRANT_COLLECTION, payload={"document_id": doc_id}, points=ids)
+        if blob_store.exists(doc_id):
+            client.delete_payload(collection_name=QDRANT_COLLECTION, keys=["document_text"], points=[first_id])
+        if rest:
+            client.delete_payload(collection_name=QDRANT_COLLECTION, keys=["upload_timestamp"], points=rest)
+
+    prefix = "[dry run] " if dry_run else ""
+    print(f"{prefix}Documents found: {len(documents)}")
+    print(f"{prefix}Blobs written: {blobs_written}")
+    print(f"{prefix}Chunks tagged with document_id: {chunks_tagged}")
+    print(f"{prefix}Chunks with no matching chunk 0 (left untouched): {orphans}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+    migrate(dry_run=args.dry_run)
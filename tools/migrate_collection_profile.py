@@ -0,0 +1,88 @@
+"""
+Re-create the documents collection under another collection profile.
+
+Quantization, HNSW and on-disk settings are fixed when the collection is created, so this
+  1. copies every point (vectors and payload) into a temporary collection created under
+     the new profile,
+  2. deletes the documents collection and creates it again under the new profile,
+  3. copies the points back and drops the temporary collection.
+Point counts are checked after each copy. Collections are created with the BM25 sparse
+vector used by hybrid search; points that do not have one yet get it from their chunk text
+on the way, so this also enables hybrid search for collections created before it existed. Stop uploads while it runs, then set
+QDRANT_COLLECTION_PROFILE to the new profile in the app's secrets.
+
+    python -m tools.migrate_collection_profile --profile int8 [--dry-run]
+"""
+import argparse
+
+from qdrant_client.http import models
+
+from service.qdrant_utils import client, QDRANT_COLLECTION, ensure_collection, forget_collection
+from service.sparse_vectors import SPARSE_VECTOR_NAME, document_vector
+from service.qdrant_queries import scroll_points
+from service.collection_profiles import PROFILES, get_profile
+
+PAGE_SIZE = 256
+
+
+def with_sparse_vector(point):
+    vector = point.vector if isinstance(point.vector, dict) else {"": point.vector}
+    if SPARSE_VECTOR_NAME not in vector:
+        vector[SPARSE_VECTOR_NAME] = document_vector((point.payload or {}).get("chunk_text") or "")
+    return vector
+
+
+def copy_points(source, target):
+    copied = 0
+    batch = []
+    for p in scroll_points(client, source, None, True, PAGE_SIZE, with_vectors=True):
+        batch.append(models.PointStruct(id=p.id, vector=with_sparse_vector(p), payload=p.payload))
+        if len(batch) == PAGE_SIZE:
+            client.upsert(collection_name=target, points=batch)
+            copied += len(batch)
+            batch = []
+    if batch:
+        client.upsert(collection_name=target, points=batch)
+        copied += len(batch)
+    return copied
+
+
+def count(collection):
+    return client.count(collection_name=collection, exact=True).count
+
+
+def migrate(profile_name, dry_run=False):
+    profile = get_profile(profile_name)
+    ensure_collection()
+    total = count(QDRANT_COLLECTION)
+    print(f"Collection '{QDRANT_COLLECTION}': {total} points -> profile '{profile_name}': {profile}")
+    if dry_run:
+        return
+
+    temporary = f"{QDRANT_COLLECTION}__migrating"
+    if client.collection_exists(temporary):
+        raise SystemExit(f"'{temporary}' already exists (left by an earlier run?); inspect and delete it first.")
+
+    ensure_collection(temporary, profile_name)
+    copied = copy_points(QDRANT_COLLECTION, temporary)
+    if count(temporary) != total:
+        raise SystemExit(f"Copied {copied} points but '{temporary}' holds {count(temporary)}; '{QDRANT_COLLECTION}' left untouched.")
+    print(f"Copied {copied} points to '{temporary}'")
+
+    client.delete_collection(QDRANT_COLLECTION)
+    forget_collection(QDRANT_COLLECTION)
+    ensure_collection(QDRANT_COLLECTION, profile_name)
+    copied = copy_points(temporary, QDRANT_COLLECTION)
+    if count(QDRANT_COLLECTION) != total:
+        raise SystemExit(f"'{QDRANT_COLLECTION}' holds {count(QDRANT_COLLECTION)} of {total} points; '{temporary}' kept for recovery.")
+    client.delete_collection(temporary)
+    forget_collection(temporary)
+    print(f"Re-created '{QDRANT_COLLECTION}' with {copied} points. Set QDRANT_COLLECTION_PROFILE = \"{profile_name}\".")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", required=True, choices=list(PROFILES))
+    parser.add_argument("--dry-run", action="store_true", help="show the point count and target profile only")
+    args = parser.parse_args()
+    migrate(args.profile, dry_run=args.dry_run)
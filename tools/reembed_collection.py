@@ -0,0 +1,84 @@
+"""
+Re-embed the documents collection with the configured embedding provider and model.
+
+Vectors from different models cannot be mixed (and usually differ in size), so after
+changing EMBEDDING_PROVIDER, EMBEDDING_MODEL or EMBEDDING_DIM every chunk is embedded again:
+  1. every point's chunk text is embedded with the new model into a temporary collection
+     created with the new vector size; payloads and BM25 sparse vectors are kept,
+  2. the documents collection is deleted and created again with the new vector size,
+  3. the points are copied back and the temporary collection is dropped.
+Set the new provider in the app's secrets (or environment) first and stop uploads while
+it runs. Vectors go through the embedding cache, so switching back later is cheap.
+
+    EMBEDDING_PROVIDER=fastembed python -m tools.reembed_collection [--dry-run]
+    EMBEDDING_MODEL=text-embedding-3-small EMBEDDING_DIM=512 python -m tools.reembed_collection
+"""
+import argparse
+
+from service.qdrant_utils import (
+    client, embeddings, QDRANT_COLLECTION, QDRANT_COLLECTION_PROFILE, EMBEDDING_PROVIDER, EMBEDDING_MODEL,
+    EMBEDDING_DIM, ensure_collection, forget_collection
+)
+from service.qdrant_queries import scroll_points
+from service.embedding_pipeline import embed_and_upsert
+from service.sparse_vectors import SPARSE_VECTOR_NAME, document_vector
+from tools.migrate_collection_profile import copy_points, count, PAGE_SIZE
+
+
+def pending_points(source, sparse):
+    for p in scroll_points(client, source, None, True, PAGE_SIZE, with_vectors=[SPARSE_VECTOR_NAME] if sparse else False):
+        payload = p.payload or {}
+        text = payload.get("chunk_text") or payload.get("document_text") or payload.get("filename") or ""
+        vector = p.vector.get(SPARSE_VECTOR_NAME) if isinstance(p.vector, dict) else None
+        yield {
+            "id": p.id,
+            "text": text,
+            "payload": payload,
+            "sparse_vectors": {SPARSE_VECTOR_NAME: vector or document_vector(payload.get("chunk_text") or "")}
+        }
+
+
+def reembed(dry_run=False):
+    if not client.collection_exists(QDRANT_COLLECTION):
+        raise SystemExit(f"'{QDRANT_COLLECTION}' does not exist; nothing to re-embed.")
+    info = client.get_collection(QDRANT_COLLECTION)
+    size = getattr(info.config.params.vectors, "size", None)
+    sparse = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+    total = count(QDRANT_COLLECTION)
+    print(f"Collection '{QDRANT_COLLECTION}': {total} points, {size}-dim vectors -> "
+          f"{EMBEDDING_PROVIDER} '{EMBEDDING_MODEL}', {EMBEDDING_DIM} dims")
+    if dry_run:
+        return
+
+    temporary = f"{QDRANT_COLLECTION}__reembedding"
+    if client.collection_exists(temporary):
+        raise SystemExit(f"'{temporary}' already exists (left by an earlier run?); inspect and delete it first.")
+
+    ensure_collection(temporary, QDRANT_COLLECTION_PROFILE)
+    embedded = embed_and_upsert(
+        pending_points(QDRANT_COLLECTION, sparse),
+        embeddings,
+        upsert=lambda points: client.upsert(collection_name=temporary, points=points),
+        on_progress=lambda done, _: print(f"Embedded {done}/{total}", end="\r")
+    )
+    if count(temporary) != total:
+        raise SystemExit(f"Embedded {embedded} points but '{temporary}' holds {count(temporary)}; '{QDRANT_COLLECTION}' left untouched.")
+    print()
+    print(f"Embedded {embedded} points into '{temporary}'. Embedding cache: {embeddings.stats()}")
+
+    client.delete_collection(QDRANT_COLLECTION)
+    forget_collection(QDRANT_COLLECTION)
+    ensure_collection(QDRANT_COLLECTION, QDRANT_COLLECTION_PROFILE)
+    copied = copy_points(temporary, QDRANT_COLLECTION)
+    if count(QDRANT_COLLECTION) != total:
+        raise SystemExit(f"'{QDRANT_COLLECTION}' holds {count(QDRANT_COLLECTION)} of {total} points; '{temporary}' kept for recovery.")
+    client.delete_collection(temporary)
+    forget_collection(temporary)
+    print(f"Re-created '{QDRANT_COLLECTION}' with {copied} {EMBEDDING_DIM}-dim points from {EMBEDDING_PROVIDER} '{EMBEDDING_MODEL}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="show the point count and vector sizes only")
+    args = parser.parse_args()
+    reembed(dry_run=args.dry_run)
@@ -0,0 +1,102 @@
+"""
+Find and purge data left behind by documents that no longer exist.
+
+Deleting a document used to remove only its chunk-0 point, so its other chunks stayed in
+the collection (and in similarity search results). This finds:
+  * chunks whose document (chunk-0 point) is gone: by `document_id`, or for untagged
+    legacy chunks by (filename, upload_timestamp)
+  * full-text blobs and catalog rows with no chunk-0 point
+  * documents whose ingestion was interrupted (catalog status still 'ingesting')
+  * with --sheets, quizzes and results that point at a missing document (quizzes are
+    deleted, results moved to the results archive)
+
+Run from the repo root with the app's secrets available, while no uploads are in progress:
+
+    python -m tools.sweep_orphans [--dry-run] [--sheets]
+"""
+import argparse
+
+from qdrant_client.http.models import PointIdsList, FilterSelector
+
+from service.qdrant_utils import client, blob_store, catalog, QDRANT_COLLECTION, ensure_collection
+from service.qdrant_queries import scroll_points, document_filter
+from service.embedding_pipeline import batched
+
+DELETE_BATCH_SIZE = 256
+
+
+def find_orphans():
+    documents = set()
+    legacy_documents = set()
+    chunks = []
+    for p in scroll_points(client, QDRANT_COLLECTION, None, ["document_id", "chunk_index", "filename", "upload_timestamp"]):
+        payload = p.payload or {}
+        if payload.get("chunk_index") == 0:
+            documents.add(str(p.id))
+            legacy_documents.add((payload.get("filename"), payload.get("upload_timestamp")))
+        else:
+            chunks.append((p.id, payload))
+
+    orphan_points = [
+        point_id for point_id, payload in chunks
+        if (payload["document_id"] not in documents if payload.get("document_id")
+            else (payload.get("filename"), payload.get("upload_timestamp")) not in legacy_documents)
+    ]
+    interrupted = {row["id"] for row in catalog.list("ingesting")}
+    documents -= interrupted
+    orphan_blobs = blob_store.ids() - documents - interrupted
+    orphan_rows = [row["id"] for row in catalog.list("ready") if row["id"] not in documents]
+    return documents, orphan_points, orphan_blobs, orphan_rows, interrupted
+
+
+def sweep_sheets(documents, dry_run):
+    from service.track_quiz import load_quizzes, delete_quizzes_by_document
+    from service.track_results import load_all_results, archive_results_by_document
+
+    quiz_documents = {str(row[1]) for row in load_quizzes()}
+    result_documents = {str(row[2]) for row in load_all_results()}
+    missing = (quiz_documents | result_documents) - documents
+    quizzes = results = 0
+    for document_id in missing:
+        if dry_run:
+            quizzes += sum(1 for row in load_quizzes() if str(row[1]) == document_id)
+            results += sum(1 for row in load_all_results() if str(row[2]) == document_id)
+        else:
+            quizzes += delete_quizzes_by_document(document_id)
+            results += archive_results_by_document(document_id)
+    return len(missing), quizzes, results
+
+
+def sweep(dry_run=False, sheets=False):
+    ensure_collection()
+    documents, orphan_points, orphan_blobs, orphan_rows, interrupted = find_orphans()
+
+    if not dry_run:
+        for batch in batched(orphan_points, DELETE_BATCH_SIZE):
+            client.delete(collection_name=QDRANT_COLLECTION, points_selector=PointIdsList(points=batch))
+        for doc_id in interrupted:
+            client.delete(collection_name=QDRANT_COLLECTION, points_selector=FilterSelector(filter=document_filter(doc_id)))
+            blob_store.delete(doc_id)
+        for doc_id in orphan_blobs:
+            blob_store.delete(doc_id)
+        catalog.remove(orphan_rows + list(interrupted))
+
+    prefix = "[dry run] " if dry_run else ""
+    print(f"{prefix}Documents found: {len(documents)}")
+    print(f"{prefix}Orphaned chunks purged: {len(orphan_points)}")
+    print(f"{prefix}Orphaned full texts purged: {len(orphan_blobs)}")
+    print(f"{prefix}Stale catalog rows removed: {len(orphan_rows)}")
+    print(f"{prefix}Interrupted ingestions purged: {len(interrupted)}")
+    if sheets:
+        missing, quizzes, results = sweep_sheets(documents, dry_run)
+        print(f"{prefix}Missing documents referenced by sheets: {missing}")
+        print(f"{prefix}Quizzes deleted: {quizzes}")
+        print(f"{prefix}Results archived: {results}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be purged without deleting")
+    parser.add_argument("--sheets", action="store_true", help="also clean up quizzes and results of missing documents")
+    args = parser.parse_args()
+    sweep(dry_run=args.dry_run, sheets=args.sheets)
@@ -0,0 +1,16 @@
+"""
+Rebuild the local document catalog from the Qdrant collection.
+
+The app fills the catalog by itself the first time documents are listed. Run this after
+changing the collection outside the app (e.g. after tools.migrate_blob_store or restoring
+a snapshot):
+
+    python -m tools.sync_catalog
+"""
+import argparse
+
+from service.qdrant_utils import sync_catalog
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    sync_catalog()